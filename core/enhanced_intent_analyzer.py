@@ -1,10 +1,29 @@
 # core/enhanced_intent_analyzer.py - Unified Intent Analysis & Query Classification
 
+import functools
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional, Tuple
 from core.prompts import load_prompt
-from core.llm_manager import call_llm
+
+
+class QuickAnalysis(NamedTuple):
+    """Result of the pattern-based pass; hashable so it can be memoized."""
+    # Intent analysis results
+    primary_resource: str
+    action: str
+    requires_filtering: bool
+    filter_conditions: Tuple[str, ...]
+    complexity: str
+    estimated_steps: int
+    oci_service: str
+    is_mutating: bool
+
+    # Classification results
+    execution_type: str
+    matched_pattern: Optional[str]
+    confidence: str
+    analysis_method: str
 
 
 class EnhancedIntentAnalyzer:
@@ -13,6 +32,16 @@ class EnhancedIntentAnalyzer:
     Replaces both intent_analyzer.py and query_classifier.py
     """
 
+    # One alternation group per action, in priority order
+    _ACTIONS = ("list", "get", "create", "delete", "stop", "update")
+    _ACTION_RE = re.compile(
+        r'\b(?:(list|show|display)|(get|describe|details?)|(create|launch|start)'
+        r'|(delete|terminate|remove)|(stop|shutdown)|(update|modify|change))\b')
+    _FILTER_RE = re.compile(r'\b(where|with|containing|filter|having)\b')
+    # Substring match, as the direct-fetch check has always done
+    _LIST_ACTION_RE = re.compile('list|show|display|get all')
+    _TOKEN_RE = re.compile(r'\w+')
+
     def __init__(self):
         # Resource mappings
         self.resource_map = {
@@ -38,6 +67,42 @@ class EnhancedIntentAnalyzer:
             "policies": ("policy", "identity")
         }
 
+        self._resource_priority = {
+            name: i for i, name in enumerate(self.resource_map)}
+        # Longest alternatives first so "security lists" beats "security list"
+        self._resource_re = re.compile('|'.join(
+            re.escape(name) for name in sorted(self.resource_map, key=len, reverse=True)))
+
+        # Second-tier synonyms, only consulted when resource_map finds nothing.
+        # Matched on word boundaries since several of these are short.
+        self.resource_synonyms = {
+            "virtual machines": ("instance", "compute"),
+            "virtual machine": ("instance", "compute"),
+            "vms": ("instance", "compute"),
+            "vm": ("instance", "compute"),
+            "compute nodes": ("instance", "compute"),
+            "disks": ("volume", "blockstorage"),
+            "disk": ("volume", "blockstorage"),
+            "object storage": ("bucket", "objectstorage"),
+            "virtual cloud networks": ("vcn", "virtualnetwork"),
+            "virtual cloud network": ("vcn", "virtualnetwork"),
+            "route table": ("route_table", "virtualnetwork"),
+            "load balancer": ("load_balancer", "loadbalancer"),
+            "lbs": ("load_balancer", "loadbalancer"),
+            "autonomous databases": ("autonomous_database", "database"),
+            "autonomous database": ("autonomous_database", "database"),
+            "adbs": ("autonomous_database", "database"),
+            "adb": ("autonomous_database", "database"),
+            "db systems": ("database", "database"),
+            "dbs": ("database", "database"),
+            "group": ("group", "identity"),
+            "policy": ("policy", "identity"),
+        }
+        self._synonym_priority = {
+            name: i for i, name in enumerate(self.resource_synonyms)}
+        self._synonym_re = re.compile(r'\b(?:' + '|'.join(
+            re.escape(name) for name in sorted(self.resource_synonyms, key=len, reverse=True)) + r')\b')
+
         # Direct fetch patterns (single API call)
         self.direct_fetch_patterns = {
             "list_users": {"service": "identity", "action": "list_users"},
@@ -58,6 +123,13 @@ class EnhancedIntentAnalyzer:
             "having", "containing", "with rules",
             "ssl", "certificate", "encrypted"
         ]
+        self._multi_step_re = re.compile(
+            '|'.join(re.escape(s) for s in self.multi_step_indicators))
+
+        # Per-instance memo: the analysis depends on the tables above, and a
+        # class-level lru_cache would key on (and keep alive) every instance
+        self._cached_quick_analysis = functools.lru_cache(maxsize=512)(
+            self._analyze_query_patterns)
 
     def analyze(self, query: str, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -68,87 +140,98 @@ class EnhancedIntentAnalyzer:
         # Step 1: Quick pattern analysis (no LLM)
         quick_result = self._quick_analysis(query)
 
-        if quick_result['confidence'] == 'high':
+        if quick_result.confidence in ('high', 'medium'):
             print(
-                f"✅ Quick analysis succeeded: {quick_result['execution_type']}")
-            return quick_result
+                f"✅ Quick analysis succeeded: {quick_result.execution_type}")
+            # Callers get their own dict since the planner adds keys to it
+            result = quick_result._asdict()
+            result['filter_conditions'] = list(quick_result.filter_conditions)
+            return result
 
         # Step 2: LLM analysis for complex cases
         print(f"🤔 Quick analysis uncertain, using LLM...")
         return self._llm_analysis(query, state)
 
-    def _quick_analysis(self, query: str) -> Dict[str, Any]:
+    def _quick_analysis(self, query: str) -> QuickAnalysis:
         """
         Fast pattern-based analysis that does BOTH intent analysis AND classification.
+        Results are memoized per normalized query.
         """
-        query_lower = query.lower()
+        return self._cached_quick_analysis(query.lower().strip())
+
+    def _analyze_query_patterns(self, query_lower: str) -> QuickAnalysis:
+        """Pure pattern analysis of an already lower-cased, stripped query."""
+        # Single-word indicators are checked against the query's words;
+        # phrases and symbols stay on substring checks
+        tokens = frozenset(self._TOKEN_RE.findall(query_lower))
 
         # === INTENT ANALYSIS ===
-        # Detect action
-        action = None
-        if re.search(r'\b(list|show|display)\b', query_lower):
-            action = "list"
-        elif re.search(r'\b(get|describe|details?)\b', query_lower):
-            action = "get"
-        elif re.search(r'\b(create|launch|start)\b', query_lower):
-            action = "create"
-        elif re.search(r'\b(delete|terminate|remove)\b', query_lower):
-            action = "delete"
-        elif re.search(r'\b(stop|shutdown)\b', query_lower):
-            action = "stop"
-        elif re.search(r'\b(update|modify|change)\b', query_lower):
-            action = "update"
+        # Detect action (earlier entries in _ACTIONS take precedence)
+        matched_groups = {m.lastindex for m in self._ACTION_RE.finditer(query_lower)}
+        action = self._ACTIONS[min(matched_groups) - 1] if matched_groups else None
 
         # Detect if action is mutating (requires confirmation)
         is_mutating = action in ['create', 'delete',
                                  'stop', 'terminate', 'update', 'remove']
 
-        # Detect resource
+        # Detect resource: one regex pass finds every resource keyword, and the
+        # earliest entry in resource_map wins, as with the old per-key scan
         primary_resource = None
         oci_service = None
-        for resource_name, (resource_type, service) in self.resource_map.items():
-            if resource_name in query_lower:
-                primary_resource = resource_type
-                oci_service = service
-                break
+        matched_names = [m.group(0)
+                         for m in self._resource_re.finditer(query_lower)]
+        if matched_names:
+            resource_name = min(
+                matched_names, key=self._resource_priority.__getitem__)
+            primary_resource, oci_service = self.resource_map[resource_name]
+        else:
+            matched_names = [m.group(0)
+                             for m in self._synonym_re.finditer(query_lower)]
+            if matched_names:
+                resource_name = min(
+                    matched_names, key=self._synonym_priority.__getitem__)
+                primary_resource, oci_service = self.resource_synonyms[resource_name]
 
         # Detect filtering
-        requires_filtering = bool(
-            re.search(r'\b(where|with|containing|filter|having)\b', query_lower))
+        requires_filtering = bool(self._FILTER_RE.search(query_lower))
 
         # Extract filter conditions
         filter_conditions = []
         if requires_filtering:
-            if 'where' in query_lower:
+            if 'where' in tokens:
                 filter_part = query_lower.split('where', 1)[1].strip()
                 filter_conditions.append(filter_part)
-            if 'ingress' in query_lower and '0.0.0.0/0' in query:
+            if 'ingress' in tokens and '0.0.0.0/0' in query_lower:
                 filter_conditions.append(
                     "ingress_rules contains source 0.0.0.0/0")
-            if 'stopped' in query_lower or 'inactive' in query_lower:
+            if 'stopped' in tokens or 'inactive' in tokens:
                 filter_conditions.append("lifecycle_state == STOPPED")
-            if 'running' in query_lower or 'active' in query_lower:
+            if 'running' in tokens or 'active' in tokens:
                 filter_conditions.append("lifecycle_state == RUNNING")
 
         # Special case: Empty bucket detection
         if (primary_resource == 'bucket' and
-                any(term in query_lower for term in ['empty', 'no files', 'no objects', 'unused'])):
+                ('empty' in tokens or 'unused' in tokens or
+                 'no files' in query_lower or 'no objects' in query_lower)):
             requires_filtering = True
             filter_conditions.append("objects == empty")
 
         # === QUERY CLASSIFICATION ===
         # Check for multi-step indicators
-        has_multi_step_indicators = any(
-            indicator in query_lower for indicator in self.multi_step_indicators)
+        has_multi_step_indicators = self._multi_step_re.search(
+            query_lower) is not None
 
-        # Check for direct fetch patterns
+        # Check for direct fetch patterns (the action check is the same for
+        # every pattern, so it is done once up front)
         is_direct_fetch = False
         matched_pattern = None
-        for pattern, config in self.direct_fetch_patterns.items():
-            if self._matches_pattern(query_lower, pattern):
-                is_direct_fetch = True
-                matched_pattern = pattern
-                break
+        has_list_action = self._LIST_ACTION_RE.search(query_lower) is not None
+        if has_list_action:
+            for pattern, config in self.direct_fetch_patterns.items():
+                if self._matches_pattern(query_lower, pattern, has_list_action):
+                    is_direct_fetch = True
+                    matched_pattern = pattern
+                    break
 
         # Determine execution type
         if has_multi_step_indicators:
@@ -157,6 +240,15 @@ class EnhancedIntentAnalyzer:
         elif is_direct_fetch and not has_multi_step_indicators:
             execution_type = "DIRECT_FETCH"
             confidence = "high"
+        elif (action == "list" and primary_resource
+                and len(set(matched_names)) == 1
+                and f"list_{primary_resource}s" in self.direct_fetch_patterns):
+            # A plain read of exactly one known resource that has a list
+            # template is enough signal for the template planner; anything
+            # else (several resources, no template) still goes to the LLM
+            execution_type = "DIRECT_FETCH"
+            confidence = "medium"
+            matched_pattern = f"list_{primary_resource}s"
         else:
             execution_type = "UNKNOWN"
             confidence = "low"
@@ -168,7 +260,7 @@ class EnhancedIntentAnalyzer:
         if requires_filtering:
             complexity = "medium"
             estimated_steps = 2
-        if len(filter_conditions) > 2 or 'and' in query_lower:
+        if len(filter_conditions) > 2 or 'and' in tokens:
             complexity = "complex"
             estimated_steps = 3
 
@@ -176,23 +268,20 @@ class EnhancedIntentAnalyzer:
         if not (action and primary_resource):
             confidence = "low"
 
-        return {
-            # Intent analysis results
-            "primary_resource": primary_resource or "unknown",
-            "action": action or "list",
-            "requires_filtering": requires_filtering,
-            "filter_conditions": filter_conditions,
-            "complexity": complexity,
-            "estimated_steps": estimated_steps,
-            "oci_service": oci_service or "unknown",
-            "is_mutating": is_mutating,
-
-            # Classification results
-            "execution_type": execution_type,
-            "matched_pattern": matched_pattern,
-            "confidence": confidence,
-            "analysis_method": "pattern_matching"
-        }
+        return QuickAnalysis(
+            primary_resource=primary_resource or "unknown",
+            action=action or "list",
+            requires_filtering=requires_filtering,
+            filter_conditions=tuple(filter_conditions),
+            complexity=complexity,
+            estimated_steps=estimated_steps,
+            oci_service=oci_service or "unknown",
+            is_mutating=is_mutating,
+            execution_type=execution_type,
+            matched_pattern=matched_pattern,
+            confidence=confidence,
+            analysis_method="pattern_matching",
+        )
 
     def _llm_analysis(self, query: str, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -209,7 +298,10 @@ class EnhancedIntentAnalyzer:
             ]
 
             # Use the call_llm function from state
-            call_llm_func = state.get('call_llm', call_llm)
+            call_llm_func = state.get('call_llm')
+            if call_llm_func is None:
+                # Deferred so pattern-only analysis never loads the LLM clients
+                from core.llm_manager import call_llm as call_llm_func
             llm_response = call_llm_func(
                 state, messages, 'intent_analyzer', use_fast_model=True)
 
@@ -240,19 +332,13 @@ class EnhancedIntentAnalyzer:
                 "analysis_method": "fallback"
             }
 
-    def _matches_pattern(self, query_lower: str, pattern: str) -> bool:
+    def _matches_pattern(self, query_lower: str, pattern: str, has_list_action: bool) -> bool:
         """Check if query matches a direct fetch pattern."""
-        pattern_parts = pattern.split('_')
-
-        # Check for action
-        action_match = any(action in query_lower for action in [
-                           'list', 'show', 'display', 'get all'])
+        if not has_list_action:
+            return False
 
         # Check for resource
-        resource_match = pattern_parts[1] in query_lower or pattern_parts[1].replace(
-            '_', ' ') in query_lower
-
-        return action_match and resource_match
+        return pattern.split('_')[1] in query_lower
 
     def get_execution_strategy(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """Get detailed execution strategy based on analysis."""
@@ -284,9 +370,13 @@ class EnhancedIntentAnalyzer:
             }
 
 
+# Shared analyzer: its lookup tables are static, and reusing one instance
+# lets the _quick_analysis memo carry across planner invocations
+_ANALYZER = EnhancedIntentAnalyzer()
+
+
 def analyze_intent_and_classify(query: str, state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Convenience function that does both intent analysis AND query classification.
     """
-    analyzer = EnhancedIntentAnalyzer()
-    return analyzer.analyze(query, state)
+    return _ANALYZER.analyze(query, state)
@@ -4,31 +4,65 @@ Fast LLM-based error handler for each node
 """
 
 import json
+import re
 from typing import Dict, Any, Optional
-from core.llm_manager import call_llm as default_call_llm
 from datetime import datetime
 import os
+from collections import deque
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON for the learning file
+    orjson = None
+
+# Keep only the most recent patterns to prevent file bloat
+MAX_LEARNED_PATTERNS = 50
+
+
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
+
+_loads = orjson.loads if orjson else json.loads
 
 
 class FastErrorHandler:
     """Fast LLM-based error handler for individual nodes"""
 
+    # Substring match (no word boundaries) so "trying"/"helpful" still count
+    _GOOD_RESPONSE_RE = re.compile(
+        "try|instead|suggest|help|alternative|check|verify|retry|again", re.IGNORECASE)
+
     def __init__(self):
-        self.learning_file = "memory/error_learning.json"
+        # JSON Lines: one pattern per line, so logging is a single append
+        self.learning_file = "memory/error_learning.jsonl"
+        self._appends = 0  # since the last compaction
         self._ensure_learning_file()
 
     def _ensure_learning_file(self):
-        """Ensure learning file exists"""
+        """Ensure learning file exists, trimmed to the last MAX_LEARNED_PATTERNS entries"""
         os.makedirs("memory", exist_ok=True)
-        if not os.path.exists(self.learning_file):
-            with open(self.learning_file, 'w') as f:
-                json.dump({"successful_patterns": []}, f)
+        try:
+            with open(self.learning_file, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            open(self.learning_file, 'a').close()
+            return
+        self._compact(lines)
+
+    def _compact(self, lines):
+        """Rewrite the learning file with only the last MAX_LEARNED_PATTERNS lines"""
+        if len(lines) > MAX_LEARNED_PATTERNS:
+            with open(self.learning_file, 'wb') as f:
+                f.writelines(lines[-MAX_LEARNED_PATTERNS:])
+        self._appends = 0
 
     def handle_error(self, error: Exception, state: Dict[str, Any], node_name: str, call_llm_func=None) -> Dict[str, Any]:
         """
         Fast LLM-based error handling for any node
         """
         if call_llm_func is None:
+            from core.llm_manager import call_llm as default_call_llm
             call_llm_func = default_call_llm
 
         # Get user input and context
@@ -82,34 +116,26 @@ Be friendly and actionable. Don't mention technical details."""
 
     def _is_good_error_response(self, response: str) -> bool:
         """Check if the error response is helpful"""
-        good_indicators = [
-            "try", "instead", "suggest", "help", "alternative",
-            "check", "verify", "retry", "again"
-        ]
-        return any(indicator in response.lower() for indicator in good_indicators)
+        return self._GOOD_RESPONSE_RE.search(response) is not None
 
     def _log_successful_pattern(self, error: str, response: str, node: str):
         """Log successful error handling patterns for learning"""
         try:
-            with open(self.learning_file, 'r') as f:
-                data = json.load(f)
-
-            # Add new pattern
             pattern = {
                 "error": error[:100],  # Truncate for storage
                 "response": response[:200],
                 "node": node,
                 "timestamp": datetime.now().isoformat()
             }
+            with open(self.learning_file, 'ab') as f:
+                f.write(_dumps(pattern) + b'\n')
 
-            data["successful_patterns"].append(pattern)
-
-            # Keep only last 50 patterns to prevent file bloat
-            if len(data["successful_patterns"]) > 50:
-                data["successful_patterns"] = data["successful_patterns"][-50:]
-
-            with open(self.learning_file, 'w') as f:
-                json.dump(data, f)
+            # Evict old patterns every MAX_LEARNED_PATTERNS appends rather
+            # than on each one, so the file stays under twice the cap
+            self._appends += 1
+            if self._appends >= MAX_LEARNED_PATTERNS:
+                with open(self.learning_file, 'rb') as f:
+                    self._compact(f.readlines())
 
         except Exception:
             # Don't fail if learning fails
@@ -118,20 +144,31 @@ Be friendly and actionable. Don't mention technical details."""
     def get_learning_stats(self) -> Dict[str, Any]:
         """Get learning statistics"""
         try:
-            with open(self.learning_file, 'r') as f:
-                data = json.load(f)
+            with open(self.learning_file, 'rb') as f:
+                patterns = deque(f, maxlen=MAX_LEARNED_PATTERNS)
             return {
-                "total_patterns": len(data.get("successful_patterns", [])),
-                "recent_patterns": data.get("successful_patterns", [])[-5:]
+                "total_patterns": len(patterns),
+                "recent_patterns": [_loads(line) for line in list(patterns)[-5:]]
             }
         except Exception:
             return {"total_patterns": 0, "recent_patterns": []}
 
 
+# Global instance
+_error_handler = None
+
+
+def get_error_handler() -> FastErrorHandler:
+    """Get global error handler instance (sets up the learning file once)."""
+    global _error_handler
+    if _error_handler is None:
+        _error_handler = FastErrorHandler()
+    return _error_handler
+
+
 # Convenience function for nodes
 def handle_node_error(error: Exception, state: Dict[str, Any], node_name: str, call_llm_func=None) -> Dict[str, Any]:
     """
     Fast error handling for any node
     """
-    handler = FastErrorHandler()
-    return handler.handle_error(error, state, node_name, call_llm_func)
+    return get_error_handler().handle_error(error, state, node_name, call_llm_func)
@@ -1,4 +1,6 @@
 # core/graph.py
+import functools
+
 from langgraph.graph import StateGraph, END
 from core.state import AgentState
 
@@ -12,17 +14,48 @@ from nodes.executor import executor_node
 from nodes.rag_retriever import rag_retriever_node
 # Import the new presentation node
 from nodes.presentation_node import presentation_node
-# Import memory nodes
-from nodes.memory_context import memory_context_node
+# Import memory nodes (memory context is loaded by the supervisor)
 from nodes.memory_manager import memory_manager_node
 
 
-def build_graph():
+# Fallback next_step for each routing node when the node leaves it unset
+_ROUTE_DEFAULTS = {
+    "supervisor": "normalizer",
+    "normalizer": None,
+    "rag_retriever": "presentation_node",
+    "verifier": None,
+}
+
+
+def _next_step_router(default):
+    """
+    Build a conditional-edge router that reads state["next_step"].
+    Each route picks exactly one successor. Branches are not fanned out
+    in parallel: the branch nodes write the plain (non-reducer) channels
+    next_step, last_node and execution_strategy (rag_retriever and planner
+    both set next_step and execution_strategy), so two of them in one
+    superstep would raise InvalidUpdateError.
+    """
+    def route(state):
+        return state.get("next_step", default)
+    return route
+
+
+# Built once at import and shared by every build_graph() call
+_ROUTERS = {source: _next_step_router(default)
+            for source, default in _ROUTE_DEFAULTS.items()}
+
+
+def build_graph(checkpointer=None):
+    """
+    Build and compile the agent graph.
+    A LangGraph checkpointer may be passed in; it is only usable once the
+    state no longer carries live objects (call_llm, memory_manager).
+    """
     graph = StateGraph(AgentState)
 
     # Define all nodes in the new architecture
-    # Memory loading (first)
-    graph.add_node("memory_context", memory_context_node)
+    # Supervisor loads memory on its first pass of each turn
     graph.add_node("supervisor", supervisor_node)
     graph.add_node("normalizer", normalizer_node)
     graph.add_node("rag_retriever", rag_retriever_node)
@@ -34,16 +67,13 @@ def build_graph():
     # Memory saving (last)
     graph.add_node("memory_manager", memory_manager_node)
 
-    # Set the entry point to memory_context (loads memory first)
-    graph.set_entry_point("memory_context")
-
-    # 0. Memory context always goes to supervisor
-    graph.add_edge("memory_context", "supervisor")
+    # Set the entry point to the supervisor (loads memory first)
+    graph.set_entry_point("supervisor")
 
     # 1. Supervisor routes to normalizer, presentation, planner, or codegen (for retries)
     graph.add_conditional_edges(
         "supervisor",
-        lambda state: state.get("next_step", "normalizer"),
+        _ROUTERS["supervisor"],
         {
             "normalizer": "normalizer",
             "presentation_node": "presentation_node",
@@ -55,7 +85,7 @@ def build_graph():
     # 2. Normalizer routes based on toggle (RAG or Planner)
     graph.add_conditional_edges(
         "normalizer",
-        lambda state: state.get("next_step"),
+        _ROUTERS["normalizer"],
         {
             "rag_retriever": "rag_retriever",
             "planner": "planner",
@@ -66,7 +96,7 @@ def build_graph():
     # 3. RAG chain - with fallback to planner
     graph.add_conditional_edges(
         "rag_retriever",
-        lambda state: state.get("next_step", "presentation_node"),
+        _ROUTERS["rag_retriever"],
         {
             "presentation_node": "presentation_node",  # RAG found data
             "planner": "planner"  # RAG fallback to planner
@@ -81,36 +111,28 @@ def build_graph():
     graph.add_conditional_edges(
         "verifier",
         # The verifier node itself now sets the next_step
-        lambda state: state.get("next_step"),
+        _ROUTERS["verifier"],
         {
             "executor": "executor",
             "presentation_node": "presentation_node"  # On failure, show error to user
         }
     )
 
-    # 6. Executor routes based on success/failure
-    graph.add_conditional_edges(
-        "executor",
-        # Always go to presentation (success or failure)
-        lambda state: "presentation_node",
-        {
-            "presentation_node": "presentation_node"  # Show results to user
-        }
-    )
+    # 6. Executor always goes to presentation (success or failure)
+    graph.add_edge("executor", "presentation_node")
 
-    # 7. Presentation node routes to memory manager (save memory) or END
-    graph.add_conditional_edges(
-        "presentation_node",
-        lambda state: "memory_manager" if state.get(
-            "memory_saved") is None else "END",
-        {
-            "memory_manager": "memory_manager",
-            "END": END
-        }
-    )
+    # 7. Presentation node always hands off to memory manager, which skips
+    # the save itself if this turn's memory was already saved
+    graph.add_edge("presentation_node", "memory_manager")
 
     # 8. Memory manager saves memory and ends the turn
     graph.add_edge("memory_manager", END)
 
     # Compile the final, executable graph
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+@functools.lru_cache(maxsize=1)
+def get_graph():
+    """Return the compiled agent graph, compiling it on first use."""
+    return build_graph()
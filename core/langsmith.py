@@ -1,8 +1,34 @@
 # core/langsmith.py
 from typing import Optional, Dict, Any
+import functools
+import json
+import logging
 import os
+import queue
+import sys
+import threading
 
+try:
+    import orjson
+except ImportError:  # optional, faster JSON for trace lines
+    orjson = None
 
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj: Any) -> str:
+    # default=str keeps non-JSON payload values (clients, callables) loggable
+    if orjson:
+        try:
+            return orjson.dumps(obj, default=str).decode('utf-8')
+        except TypeError:
+            pass  # e.g. non-str dict keys, which json.dumps converts
+    return json.dumps(obj, default=str)
+
+
+# Memoized on first use rather than at import: app.py loads .env after
+# importing this module, so the keys may not be set yet at import time
+@functools.lru_cache(maxsize=1)
 def is_enabled() -> bool:
     # Support either LangSmith legacy or LangChain unified env vars
     return bool(os.getenv("LANGSMITH_API_KEY") or os.getenv("LANGCHAIN_API_KEY"))
@@ -12,13 +38,54 @@ def status_badge() -> str:
     return "🟢 LangSmith Connected" if is_enabled() else "⚪ LangSmith Off"
 
 
+# Events are serialized by the caller (so later changes to the payload
+# can't race) and written by a daemon thread so callers never block on
+# stdout; when the queue is full, new events are dropped and counted
+TRACE_QUEUE_SIZE = 1000
+_trace_queue: "queue.Queue" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+_drain_thread: Optional[threading.Thread] = None
+_drain_lock = threading.Lock()
+_dropped_lock = threading.Lock()
+dropped_events = 0
+
+
+def _drain():
+    while True:
+        line = _trace_queue.get()
+        try:
+            # Minimal structured log to stdout so LangSmith proxy tools can pick it up if present
+            sys.stdout.write(f"[LANGSMITH] {line}\n")
+        except Exception:
+            logger.exception("Failed to write LangSmith trace line")
+
+
+def _ensure_drain_thread():
+    global _drain_thread
+    if _drain_thread is None:
+        with _drain_lock:
+            if _drain_thread is None:
+                _drain_thread = threading.Thread(
+                    target=_drain, name="langsmith-trace", daemon=True)
+                _drain_thread.start()
+
+
 def trace(event: str, payload: Optional[Dict[str, Any]] = None):
     # Minimal, safe no-op if not configured
     if not is_enabled():
         return
+    global dropped_events
     try:
-        # Minimal structured log to stdout so LangSmith proxy tools can pick it up if present
-        line = {"event": event, "payload": payload or {}}
-        print(f"[LANGSMITH] {line}")
+        line = _dumps({"event": event, "payload": payload or {}})
     except Exception:
-        pass
+        logger.exception("Failed to serialize LangSmith trace event %r", event)
+        return
+    _ensure_drain_thread()
+    try:
+        _trace_queue.put_nowait(line)
+    except queue.Full:
+        with _dropped_lock:
+            dropped_events += 1
+            dropped = dropped_events
+        if dropped == 1 or dropped % TRACE_QUEUE_SIZE == 0:
+            logger.warning("LangSmith trace queue full; %d events dropped so far",
+                           dropped)
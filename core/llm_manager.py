@@ -1,5 +1,9 @@
 # core/llm_manager.py
+import contextlib
+import functools
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import time
 import streamlit as st
 from pydantic import SecretStr
@@ -12,6 +16,9 @@ from langchain_cohere import ChatCohere
 import requests
 import json
 
+# Verbose per-call logging; the same switch app.py uses
+DEBUG = bool(os.getenv("OCI_COPILOT_DEBUG"))
+
 # ============================================================================
 # NODE-SPECIFIC MODEL CONFIGURATION (Multi-Provider)
 # ============================================================================
@@ -59,71 +66,158 @@ PROVIDER_MODELS = {
 }
 
 
+# All available providers with priority order
+ALL_PROVIDERS = ('gemini', 'openai', 'anthropic',
+                 'groq', 'deepseek', 'mistral', 'cohere')
+
+# Per selected provider: that provider first, then the others in priority order
+FALLBACK_ORDER = {
+    selected: (selected,) + tuple(p for p in ALL_PROVIDERS if p != selected)
+    for selected in ALL_PROVIDERS
+}
+
+# (provider, 'fast'/'powerful') -> model name
+MODEL_FOR = {
+    (provider, model_type): model_name
+    for provider, models in PROVIDER_MODELS.items()
+    for model_type, model_name in models.items()
+}
+
+
+_LC_MESSAGE_CLS = {'system': SystemMessage, 'user': HumanMessage}
+
+
 def _to_lc_messages(messages):
-    lc_messages = []
-    for msg in messages:
-        if msg['role'] == 'system':
-            lc_messages.append(SystemMessage(content=msg['content']))
-        elif msg['role'] == 'user':
-            lc_messages.append(HumanMessage(content=msg['content']))
-    return lc_messages
+    # model_construct skips pydantic validation; role/content are plain strings here
+    return [_LC_MESSAGE_CLS[msg['role']].model_construct(content=msg['content'])
+            for msg in messages if msg['role'] in _LC_MESSAGE_CLS]
+
+
+def _limit_kwargs(timeout=None, max_retries=None, max_tokens=None,
+                  tokens_field='max_tokens', timeout_field='timeout'):
+    """Only forward limits that were explicitly requested so provider defaults stay intact."""
+    kwargs = {}
+    if timeout is not None:
+        kwargs[timeout_field] = timeout
+    if max_retries is not None:
+        kwargs['max_retries'] = max_retries
+    if max_tokens is not None:
+        kwargs[tokens_field] = max_tokens
+    return kwargs
+
+
+def _post_with_retries(url, headers, data, timeout=None, max_retries=None):
+    """POST to an OpenAI-compatible endpoint, retrying connection failures/timeouts."""
+    attempts = 1 + (max_retries or 0)
+    for attempt in range(attempts):
+        try:
+            return requests.post(url, headers=headers, json=data, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == attempts - 1:
+                raise
 
 
-def _call_openai(messages, model_name=None):
+@functools.lru_cache(maxsize=16)
+def _get_chat_model(provider, model_name, api_key, timeout=None, max_retries=None, max_tokens=None):
+    """
+    Build a LangChain chat model once per provider/model/key/limits.
+    The key is part of the cache key since the sidebar can change it at runtime.
+    """
+    if provider == 'openai':
+        return ChatOpenAI(api_key=api_key, model=model_name, temperature=0.1,
+                          **_limit_kwargs(timeout, max_retries, max_tokens))
+    if provider == 'gemini':
+        return ChatGoogleGenerativeAI(api_key=SecretStr(
+            api_key), model=model_name, temperature=0.1,
+            **_limit_kwargs(timeout, max_retries, max_tokens, tokens_field='max_output_tokens'))
+    if provider == 'groq':
+        return ChatGroq(api_key=SecretStr(api_key),
+                        model=model_name, temperature=0.1,
+                        **_limit_kwargs(timeout, max_retries, max_tokens))
+    if provider == 'anthropic':
+        return ChatAnthropic(api_key=api_key, model=model_name, temperature=0.1,
+                             **_limit_kwargs(timeout, max_retries, max_tokens))
+    if provider == 'cohere':
+        # Cohere takes max_tokens per invoke, not on the client
+        return ChatCohere(api_key=api_key, model=model_name, temperature=0.1,
+                          **_limit_kwargs(timeout, max_retries, timeout_field='timeout_seconds'))
+    raise ValueError(f"No LangChain chat model for provider '{provider}'")
+
+
+def _call_openai(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None,
+                 lc_messages=None):
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         raise ValueError("OPENAI_API_KEY not set")
 
     model_name = model_name or "gpt-4o"
-    print(f"   Using OpenAI model: {model_name}")
-    llm = ChatOpenAI(api_key=api_key, model=model_name, temperature=0.1)
-    response = llm.invoke(_to_lc_messages(messages))
+    if DEBUG:
+        print(f"   Using OpenAI model: {model_name}")
+    llm = _get_chat_model('openai', model_name, api_key,
+                          timeout, max_retries, max_tokens)
+    if lc_messages is None:
+        lc_messages = _to_lc_messages(messages)
+    response = llm.invoke(lc_messages)
     return response.content
 
 
-def _call_gemini(messages, model_name=None):
+def _call_gemini(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None,
+                 lc_messages=None):
     api_key = os.getenv('GOOGLE_API_KEY')
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not set")
     if model_name is None:
         model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
-    print(f"   Using Gemini model: {model_name}")
-    llm = ChatGoogleGenerativeAI(api_key=SecretStr(
-        api_key), model=model_name, temperature=0.1)
-    response = llm.invoke(_to_lc_messages(messages))
+    if DEBUG:
+        print(f"   Using Gemini model: {model_name}")
+    llm = _get_chat_model('gemini', model_name, api_key,
+                          timeout, max_retries, max_tokens)
+    if lc_messages is None:
+        lc_messages = _to_lc_messages(messages)
+    response = llm.invoke(lc_messages)
     return response.content
 
 
-def _call_groq(messages, model_name=None):
+def _call_groq(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None,
+               lc_messages=None):
     api_key = os.getenv('GROQ_API_KEY')
     if not api_key:
         raise ValueError("GROQ_API_KEY not set")
     model_name = model_name or "llama-3.3-70b-versatile"
-    print(f"   Using Groq model: {model_name}")
-    llm = ChatGroq(api_key=SecretStr(api_key),
-                   model=model_name, temperature=0.1)
-    response = llm.invoke(_to_lc_messages(messages))
+    if DEBUG:
+        print(f"   Using Groq model: {model_name}")
+    llm = _get_chat_model('groq', model_name, api_key,
+                          timeout, max_retries, max_tokens)
+    if lc_messages is None:
+        lc_messages = _to_lc_messages(messages)
+    response = llm.invoke(lc_messages)
     return response.content
 
 
-def _call_anthropic(messages, model_name=None):
+def _call_anthropic(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None,
+                    lc_messages=None):
     api_key = os.getenv('ANTHROPIC_API_KEY')
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not set")
     model_name = model_name or "claude-3-5-sonnet-20241022"
-    print(f"   Using Anthropic model: {model_name}")
-    llm = ChatAnthropic(api_key=api_key, model=model_name, temperature=0.1)
-    response = llm.invoke(_to_lc_messages(messages))
+    if DEBUG:
+        print(f"   Using Anthropic model: {model_name}")
+    llm = _get_chat_model('anthropic', model_name, api_key,
+                          timeout, max_retries, max_tokens)
+    if lc_messages is None:
+        lc_messages = _to_lc_messages(messages)
+    response = llm.invoke(lc_messages)
     return response.content
 
 
-def _call_deepseek(messages, model_name=None):
+def _call_deepseek(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None):
     api_key = os.getenv('DEEPSEEK_API_KEY')
     if not api_key:
         raise ValueError("DEEPSEEK_API_KEY not set")
 
     model_name = model_name or "deepseek-coder-33b-instruct"
-    print(f"   Using DeepSeek model: {model_name}")
+    if DEBUG:
+        print(f"   Using DeepSeek model: {model_name}")
 
     # DeepSeek API call
     url = "https://api.deepseek.com/v1/chat/completions"
@@ -146,22 +240,23 @@ def _call_deepseek(messages, model_name=None):
         "model": model_name,
         "messages": deepseek_messages,
         "temperature": 0.1,
-        "max_tokens": 4000
+        "max_tokens": max_tokens or 4000
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = _post_with_retries(url, headers, data, timeout, max_retries)
     response.raise_for_status()
     result = response.json()
     return result['choices'][0]['message']['content']
 
 
-def _call_mistral(messages, model_name=None):
+def _call_mistral(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None):
     api_key = os.getenv('MISTRAL_API_KEY')
     if not api_key:
         raise ValueError("MISTRAL_API_KEY not set")
 
     model_name = model_name or "mistral-nemo-12b-instruct"
-    print(f"   Using Mistral model: {model_name}")
+    if DEBUG:
+        print(f"   Using Mistral model: {model_name}")
 
     # Mistral API call
     url = "https://api.mistral.ai/v1/chat/completions"
@@ -184,29 +279,204 @@ def _call_mistral(messages, model_name=None):
         "model": model_name,
         "messages": mistral_messages,
         "temperature": 0.1,
-        "max_tokens": 4000
+        "max_tokens": max_tokens or 4000
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = _post_with_retries(url, headers, data, timeout, max_retries)
     response.raise_for_status()
     result = response.json()
     return result['choices'][0]['message']['content']
 
 
-def _call_cohere(messages, model_name=None):
+def _call_cohere(messages, model_name=None, timeout=None, max_retries=None, max_tokens=None,
+                 lc_messages=None):
     api_key = os.getenv('COHERE_API_KEY')
     if not api_key:
         raise ValueError("COHERE_API_KEY not set")
 
     model_name = model_name or "command-r-plus"
-    print(f"   Using Cohere model: {model_name}")
+    if DEBUG:
+        print(f"   Using Cohere model: {model_name}")
 
     # Use LangChain Cohere integration
-    llm = ChatCohere(api_key=api_key, model=model_name, temperature=0.1)
-    response = llm.invoke(_to_lc_messages(messages))
+    llm = _get_chat_model('cohere', model_name, api_key, timeout, max_retries)
+    invoke_kwargs = {'max_tokens': max_tokens} if max_tokens is not None else {}
+    if lc_messages is None:
+        lc_messages = _to_lc_messages(messages)
+    response = llm.invoke(lc_messages, **invoke_kwargs)
     return response.content
 
 
+_CALLERS = {
+    'gemini': _call_gemini,
+    'openai': _call_openai,
+    'anthropic': _call_anthropic,
+    'groq': _call_groq,
+    'deepseek': _call_deepseek,
+    'mistral': _call_mistral,
+    'cohere': _call_cohere,
+}
+
+# Providers whose callers take pre-converted LangChain messages
+_LC_PROVIDERS = frozenset({'gemini', 'openai', 'anthropic', 'groq', 'cohere'})
+
+
+def _call_provider(provider, messages, model_name, lc_messages=None, timeout=None):
+    """Dispatch one request to a provider's caller."""
+    caller = _CALLERS.get(provider)
+    if caller is None:
+        raise ValueError(f"Unknown LLM provider '{provider}'")
+    if provider in _LC_PROVIDERS:
+        return caller(messages, model_name=model_name, lc_messages=lc_messages,
+                      timeout=timeout)
+    return caller(messages, model_name=model_name, timeout=timeout)
+
+
+def _report_failure(provider, selected_provider, error):
+    error_msg = str(error)
+
+    # Check for rate limit errors
+    if "ResourceExhausted" in error_msg or "429" in error_msg or "quota" in error_msg.lower():
+        print(f"⚠️ Rate limit exceeded for '{provider}': {error}")
+    elif provider == selected_provider:
+        print(f"❌ PRIMARY provider '{provider}' failed: {error}")
+    else:
+        print(f"❌ FALLBACK provider '{provider}' failed: {error}")
+
+
+_status_local = threading.local()
+
+
+def _write_node_status(updates):
+    try:
+        if 'node_status' not in st.session_state:
+            st.session_state.node_status = {}
+        st.session_state.node_status.update(updates)
+    except Exception:
+        pass
+
+
+def flush_node_status():
+    """Apply node_status updates collected so far by status_batch()."""
+    pending = getattr(_status_local, 'pending', None)
+    if pending:
+        _write_node_status(pending)
+        pending.clear()
+
+
+@contextlib.contextmanager
+def status_batch():
+    """
+    Collect call_llm's node_status writes on this thread and apply them in
+    one session_state update per flush_node_status() call and on exit.
+    """
+    _status_local.pending = {}
+    try:
+        yield flush_node_status
+    finally:
+        flush_node_status()
+        _status_local.pending = None
+
+
+def _record_success(node_name, provider, model_name, result, start_time):
+    elapsed = time.time() - start_time
+    print(f"✅ {node_name} completed in {elapsed:.2f}s")
+    if DEBUG:
+        print(
+            f"DEBUG: LLM result type: {type(result)}, length: {len(result) if isinstance(result, str) else -1}")
+
+    # Update UI status if possible (batched inside status_batch())
+    status = {
+        'status': 'completed',
+        'time': elapsed,
+        'model': model_name,
+        'provider': provider
+    }
+    pending = getattr(_status_local, 'pending', None)
+    if pending is not None:
+        pending[node_name] = status
+    else:
+        _write_node_status({node_name: status})
+
+    if DEBUG:
+        print(f"DEBUG: Returning result from {provider}: {type(result)}")
+    return result
+
+
+# Seconds to wait on the primary provider before also starting the fallback.
+# A request that has already started cannot be cancelled: once both are in
+# flight the loser keeps running (and is billed) until it returns, holding a
+# hedge worker meanwhile. HEDGE_TIMEOUT bounds how long that can last, so a
+# late provider cannot tie up the pool and block later hedged calls.
+HEDGE_DELAY = 2.0
+HEDGE_TIMEOUT = 20.0
+_hedge_executor = None
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="llm-hedge")
+    return _hedge_executor
+
+
+def _hedged_call(providers, selected_provider, node_model_type, messages, lc_messages):
+    """
+    Start the first provider; start the next one as well if it fails or has
+    not answered within HEDGE_DELAY. The first success wins; hedges that have
+    not started yet are cancelled, and one already running is left to finish
+    in the background, cut off by its HEDGE_TIMEOUT request timeout.
+    Returns (provider, model, result) or raises the last error.
+    """
+    executor = _get_hedge_executor()
+    waiting = list(providers)
+    futures = {}
+    last_error = None
+    deadline = time.monotonic() + HEDGE_TIMEOUT
+
+    def start_next():
+        provider = waiting.pop(0)
+        model_name = MODEL_FOR.get((provider, node_model_type))
+        if DEBUG:
+            print(f"🔀 Hedged call to {provider} model: {model_name}")
+        future = executor.submit(_call_provider, provider, messages,
+                                 model_name, lc_messages, HEDGE_TIMEOUT)
+        futures[future] = (provider, model_name)
+
+    def cancel_pending():
+        for future in futures:
+            future.cancel()
+
+    start_next()
+    while futures:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            cancel_pending()
+            raise TimeoutError(
+                f"No LLM provider answered within {HEDGE_TIMEOUT}s") from last_error
+        done, _ = wait(futures,
+                       timeout=min(HEDGE_DELAY, remaining) if waiting else remaining,
+                       return_when=FIRST_COMPLETED)
+        if not done:
+            if waiting and time.monotonic() < deadline:
+                start_next()
+            continue
+        for future in done:
+            provider, model_name = futures.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                _report_failure(provider, selected_provider, e)
+                if waiting:
+                    start_next()
+                continue
+            cancel_pending()
+            return provider, model_name, result
+    raise last_error
+
+
 def call_llm(state, messages, node_name='node', use_fast_model=False):
     """
     Call LLM with node-specific model selection across all providers.
@@ -217,138 +487,84 @@ def call_llm(state, messages, node_name='node', use_fast_model=False):
         node_name: Name of calling node (normalizer, planner, codegen, etc.)
         use_fast_model: If True, use fast/cheap models (for intent analysis, etc.)
     """
-    print(f"DEBUG: call_llm called with node_name: {node_name}")
-    print(f"DEBUG: call_llm messages count: {len(messages)}")
+    if DEBUG:
+        print(f"DEBUG: call_llm called with node_name: {node_name}")
+        print(f"DEBUG: call_llm messages count: {len(messages)}")
     start_time = time.time()
 
     # Get node model preference (fast/powerful)
     node_model_type = NODE_MODEL_CONFIG.get(node_name, 'fast')
-    print(f"🎯 Node '{node_name}' → Model type: {node_model_type}")
+    if DEBUG:
+        print(f"🎯 Node '{node_name}' → Model type: {node_model_type}")
 
     # Get user's preferred provider
     llm_preference = state.get("llm_preference", {})
     selected_provider = llm_preference.get("provider", "gemini")
-    print(f"🔧 Selected provider: {selected_provider}")
+    if DEBUG:
+        print(f"🔧 Selected provider: {selected_provider}")
 
     # Get the specific model for this provider and node type
-    provider_models = PROVIDER_MODELS.get(selected_provider, {})
-    specific_model = provider_models.get(node_model_type)
+    specific_model = MODEL_FOR.get((selected_provider, node_model_type))
 
     if not specific_model:
         print(
-            f"⚠️ No model configured for {selected_provider}/{node_model_type}, using defaults")
-        # Fallback to default models
-        if selected_provider == 'gemini':
-            specific_model = 'gemini-2.5-flash' if node_model_type == 'fast' else 'gemini-2.5-pro'
-        elif selected_provider == 'openai':
-            specific_model = 'gpt-4o-mini' if node_model_type == 'fast' else 'gpt-4o'
-        elif selected_provider == 'anthropic':
-            specific_model = 'claude-3-5-haiku-20241022' if node_model_type == 'fast' else 'claude-3-5-sonnet-20241022'
-        elif selected_provider == 'groq':
-            specific_model = 'llama-3.3-70b-versatile'
-
-    print(f"🎯 Using {selected_provider} model: {specific_model}")
-
-    # All available providers with priority order
-    all_providers = ['gemini', 'openai', 'anthropic',
-                     'groq', 'deepseek', 'mistral', 'cohere']
-
-    # Create fallback order: selected provider first, then others
-    providers_to_try = [selected_provider]
-    for provider in all_providers:
-        if provider != selected_provider:
-            providers_to_try.append(provider)
-
-    print(f"🔄 Fallback order: {providers_to_try}")
+            f"⚠️ No model configured for {selected_provider}/{node_model_type}")
+
+    if DEBUG:
+        print(f"🎯 Using {selected_provider} model: {specific_model}")
+
+    # Fallback order: selected provider first, then others
+    providers_to_try = FALLBACK_ORDER.get(
+        selected_provider, (selected_provider,) + ALL_PROVIDERS)
+
+    if DEBUG:
+        print(f"🔄 Fallback order: {list(providers_to_try)}")
 
     last_error = None
+    # Converted once and shared by every LangChain-backed provider below
+    lc_messages = _to_lc_messages(messages)
 
-    for current_provider in providers_to_try:
+    attempts = providers_to_try
+    if use_fast_model and len(providers_to_try) > 1:
+        # Fast, low-cost calls hedge the primary with the first fallback
         try:
-            if current_provider == selected_provider:
-                print(f"🎯 Trying PRIMARY provider: {current_provider}")
-            else:
-                print(f"🔄 Trying FALLBACK provider: {current_provider}")
+            current_provider, model_to_use, result = _hedged_call(
+                providers_to_try[:2], selected_provider, node_model_type,
+                messages, lc_messages)
+            return _record_success(node_name, current_provider, model_to_use,
+                                   result, start_time)
+        except Exception as e:
+            last_error = e
+        attempts = providers_to_try[2:]
+
+    for current_provider in attempts:
+        try:
+            if DEBUG:
+                if current_provider == selected_provider:
+                    print(f"🎯 Trying PRIMARY provider: {current_provider}")
+                else:
+                    print(f"🔄 Trying FALLBACK provider: {current_provider}")
 
             # Get the model for this provider and node type
-            provider_models = PROVIDER_MODELS.get(current_provider, {})
-            model_to_use = provider_models.get(node_model_type)
-
-            if not model_to_use:
-                # Use defaults if not configured
-                if current_provider == 'gemini':
-                    model_to_use = 'gemini-2.5-flash' if node_model_type == 'fast' else 'gemini-2.5-pro'
-                elif current_provider == 'openai':
-                    model_to_use = 'gpt-4o-mini' if node_model_type == 'fast' else 'gpt-4o'
-                elif current_provider == 'anthropic':
-                    model_to_use = 'claude-3-5-haiku-20241022' if node_model_type == 'fast' else 'claude-3-5-sonnet-20241022'
-                elif current_provider == 'groq':
-                    model_to_use = 'llama-3.3-70b-versatile'
-                elif current_provider == 'deepseek':
-                    model_to_use = 'deepseek-coder-6.7b-instruct' if node_model_type == 'fast' else 'deepseek-coder-33b-instruct'
-                elif current_provider == 'mistral':
-                    model_to_use = 'mistral-7b-instruct' if node_model_type == 'fast' else 'mistral-nemo-12b-instruct'
-                elif current_provider == 'cohere':
-                    model_to_use = 'command-light' if node_model_type == 'fast' else 'command-r-plus'
-
-            print(f"   Using {current_provider} model: {model_to_use}")
+            model_to_use = MODEL_FOR.get((current_provider, node_model_type))
+
+            if DEBUG:
+                print(f"   Using {current_provider} model: {model_to_use}")
 
             # Call the appropriate provider
-            if current_provider == 'gemini':
-                result = _call_gemini(messages, model_name=model_to_use)
-            elif current_provider == 'openai':
-                result = _call_openai(messages, model_name=model_to_use)
-            elif current_provider == 'anthropic':
-                result = _call_anthropic(messages, model_name=model_to_use)
-            elif current_provider == 'groq':
-                result = _call_groq(messages, model_name=model_to_use)
-            elif current_provider == 'deepseek':
-                result = _call_deepseek(messages, model_name=model_to_use)
-            elif current_provider == 'mistral':
-                result = _call_mistral(messages, model_name=model_to_use)
-            elif current_provider == 'cohere':
-                result = _call_cohere(messages, model_name=model_to_use)
-
-            elapsed = time.time() - start_time
-            print(f"✅ {node_name} completed in {elapsed:.2f}s")
-            print(
-                f"DEBUG: LLM result type: {type(result)}, length: {len(str(result)) if result else 'None'}")
-
-            # Update UI status if possible
-            try:
-                if 'node_status' not in st.session_state:
-                    st.session_state.node_status = {}
-                st.session_state.node_status[node_name] = {
-                    'status': 'completed',
-                    'time': elapsed,
-                    'model': model_to_use,
-                    'provider': current_provider
-                }
-            except:
-                pass
-
-            print(
-                f"DEBUG: Returning result from {current_provider}: {type(result)}")
-            return result
+            result = _call_provider(
+                current_provider, messages, model_to_use, lc_messages)
+            return _record_success(node_name, current_provider, model_to_use,
+                                   result, start_time)
 
         except Exception as e:
             last_error = e
-            error_msg = str(e)
-
-            # Check for rate limit errors
-            if "ResourceExhausted" in error_msg or "429" in error_msg or "quota" in error_msg.lower():
-                print(f"⚠️ Rate limit exceeded for '{current_provider}': {e}")
-            else:
-                if current_provider == selected_provider:
-                    print(
-                        f"❌ PRIMARY provider '{current_provider}' failed: {e}")
-                else:
-                    print(
-                        f"❌ FALLBACK provider '{current_provider}' failed: {e}")
+            _report_failure(current_provider, selected_provider, e)
             continue
 
     # If all providers failed
     error_message = f"All LLM providers failed at node '{node_name}'. Selected: {selected_provider}. Last error: {last_error}"
-    print(f"DEBUG: LLM call failed, returning error: {error_message}")
+    if DEBUG:
+        print(f"DEBUG: LLM call failed, returning error: {error_message}")
     st.error(error_message)
     return f"[ERROR: {error_message}]"
@@ -2,126 +2,152 @@
 Memory Cache - Handles in-memory caching for fast access
 """
 
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, NamedTuple, Optional
+
+
+# Expired entries are purged every this many inserts, besides on stats reads
+PURGE_EVERY = 64
+
+
+class _CacheEntry(NamedTuple):
+    expiry: float  # time.monotonic() deadline
+    data: Any
 
 
 class MemoryCache:
     """Handles in-memory caching for fast access to memory data"""
 
-    def __init__(self):
-        self.conversation_cache = {}
-        self.context_cache = {}
-        self.user_preferences_cache = {}
-        self.project_context_cache = {}
+    def __init__(self, max_size: int = 1024):
+        # Each cache maps key -> _CacheEntry
+        self.conversation_cache = OrderedDict()
+        self.context_cache = OrderedDict()
+        self.user_preferences_cache = OrderedDict()
+        self.project_context_cache = OrderedDict()
         self.cache_ttl = 300  # 5 minutes TTL
+        self.max_size = max_size  # per cache; least recently used goes first
+        self._now = time.monotonic
+        self._caches = {
+            'conversation': self.conversation_cache,
+            'context': self.context_cache,
+            'user_preferences': self.user_preferences_cache,
+            'project_context': self.project_context_cache,
+        }
+        # (expiry, cache name, key) for every insert; entries whose key has
+        # since been re-cached or dropped are skipped when popped
+        self._expiry_heap = []
+        self._inserts = 0
+        # One lock per cache so callers on different caches don't contend;
+        # the heap lock may be held while taking a cache lock, never the reverse
+        self._locks = {name: threading.Lock() for name in self._caches}
+        self._heap_lock = threading.Lock()
+
+    def _get(self, name: str, key: str):
+        """Return the cached data for key, or None if missing or expired"""
+        cache = self._caches[name]
+        with self._locks[name]:
+            try:
+                entry = cache[key]
+            except KeyError:
+                return None
+            if entry.expiry < self._now():
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+            return entry.data
+
+    def _put(self, name: str, key: str, data: Any):
+        """Store data under key with a fresh TTL, evicting the LRU entry if full"""
+        cache = self._caches[name]
+        expiry = self._now() + self.cache_ttl
+        with self._locks[name]:
+            cache[key] = _CacheEntry(expiry, data)
+            cache.move_to_end(key)
+            if len(cache) > self.max_size:
+                cache.popitem(last=False)
+
+        with self._heap_lock:
+            heapq.heappush(self._expiry_heap, (expiry, name, key))
+            self._inserts += 1
+            purge = self._inserts % PURGE_EVERY == 0
+        if purge:
+            self._purge_expired()
+
+    def _purge_expired(self):
+        """Drop every expired entry, oldest expiry first"""
+        heap = self._expiry_heap
+        now = self._now()
+        with self._heap_lock:
+            while heap and heap[0][0] < now:
+                expiry, name, key = heapq.heappop(heap)
+                cache = self._caches[name]
+                with self._locks[name]:
+                    entry = cache.get(key)
+                    if entry is not None and entry.expiry == expiry:
+                        del cache[key]
 
     def get_conversation_context(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get conversation context from cache"""
-        if session_id in self.conversation_cache:
-            cache_data = self.conversation_cache[session_id]
-            if self._is_cache_valid(cache_data.get('timestamp')):
-                return cache_data.get('data')
-        return None
+        return self._get('conversation', session_id)
 
     def cache_conversation_context(self, session_id: str, data: Dict[str, Any]):
         """Cache conversation context"""
-        self.conversation_cache[session_id] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
+        self._put('conversation', session_id, data)
 
     def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user preferences from cache"""
-        if user_id in self.user_preferences_cache:
-            cache_data = self.user_preferences_cache[user_id]
-            if self._is_cache_valid(cache_data.get('timestamp')):
-                return cache_data.get('data')
-        return None
+        return self._get('user_preferences', user_id)
 
     def cache_user_preferences(self, user_id: str, preferences: Dict[str, Any]):
         """Cache user preferences"""
-        self.user_preferences_cache[user_id] = {
-            'data': preferences,
-            'timestamp': datetime.now()
-        }
+        self._put('user_preferences', user_id, preferences)
 
     def get_project_context(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project context from cache"""
-        if project_id in self.project_context_cache:
-            cache_data = self.project_context_cache[project_id]
-            if self._is_cache_valid(cache_data.get('timestamp')):
-                return cache_data.get('data')
-        return None
+        return self._get('project_context', project_id)
 
     def cache_project_context(self, project_id: str, context: Dict[str, Any]):
         """Cache project context"""
-        self.project_context_cache[project_id] = {
-            'data': context,
-            'timestamp': datetime.now()
-        }
+        self._put('project_context', project_id, context)
 
     def get_recent_actions(self, session_id: str) -> list:
         """Get recent actions from cache"""
-        if session_id in self.context_cache:
-            cache_data = self.context_cache[session_id]
-            if self._is_cache_valid(cache_data.get('timestamp')):
-                return cache_data.get('data', {}).get('recent_actions', [])
-        return []
+        actions = self._get('context', session_id)
+        return actions if actions is not None else []
 
     def cache_recent_actions(self, session_id: str, actions: list):
         """Cache recent actions"""
-        if session_id not in self.context_cache:
-            self.context_cache[session_id] = {}
-
-        self.context_cache[session_id].update({
-            'recent_actions': actions,
-            'timestamp': datetime.now()
-        })
-
-    def _is_cache_valid(self, timestamp: Optional[datetime]) -> bool:
-        """Check if cache entry is still valid"""
-        if not timestamp:
-            return False
-
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp)
-
-        return datetime.now() - timestamp < timedelta(seconds=self.cache_ttl)
+        self._put('context', session_id, actions)
 
     def invalidate_cache(self, cache_type: str, identifier: str = None):
         """Invalidate specific cache when data changes"""
-        if cache_type == "conversation":
-            if identifier:
-                self.conversation_cache.pop(identifier, None)
-            else:
-                self.conversation_cache.clear()
-
-        elif cache_type == "user_preferences":
-            if identifier:
-                self.user_preferences_cache.pop(identifier, None)
-            else:
-                self.user_preferences_cache.clear()
-
-        elif cache_type == "project_context":
-            if identifier:
-                self.project_context_cache.pop(identifier, None)
-            else:
-                self.project_context_cache.clear()
+        if cache_type in ("conversation", "user_preferences", "project_context"):
+            cache = self._caches[cache_type]
+            with self._locks[cache_type]:
+                if identifier:
+                    cache.pop(identifier, None)
+                else:
+                    cache.clear()
 
         elif cache_type == "all":
-            self.conversation_cache.clear()
-            self.user_preferences_cache.clear()
-            self.project_context_cache.clear()
-            self.context_cache.clear()
+            for name, cache in self._caches.items():
+                with self._locks[name]:
+                    cache.clear()
+            with self._heap_lock:
+                self._expiry_heap.clear()
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        self._purge_expired()
         return {
             "conversation_cache_size": len(self.conversation_cache),
             "user_preferences_cache_size": len(self.user_preferences_cache),
             "project_context_cache_size": len(self.project_context_cache),
             "context_cache_size": len(self.context_cache),
-            "cache_ttl": self.cache_ttl
+            "cache_ttl": self.cache_ttl,
+            "max_size": self.max_size
         }
 
@@ -3,9 +3,38 @@ Long-term memory for CloudAgentra
 Handles persistent user preferences and project context
 """
 
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from .store import format_timestamp, intern_name, with_iso_timestamps
+
+
+def _hashable(value: Any):
+    """Hashable stand-in for a pattern value (dicts and lists included)"""
+    if isinstance(value, dict):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _pattern_signature(pattern_data: Dict[str, Any]) -> int:
+    return hash(_hashable(pattern_data))
+
+
+def _pattern_rank(pattern: Dict[str, Any]) -> tuple:
+    """Suggestion ranking: frequency, then recency"""
+    return pattern['frequency'], pattern.get('_last_seen', pattern['_ts'])
+
+
+# Number of suggestions returned by get_smart_suggestions
+SUGGESTION_COUNT = 5
+
 
 class LongTermMemory:
     """Handles long-term memory for user preferences and project context"""
@@ -15,6 +44,14 @@ class LongTermMemory:
         self.project_context = {}
         self.learning_patterns = {}
         self.user_patterns = {}
+        # signature -> (key set, stored pattern) pairs, per pattern list, so a
+        # new pattern is only compared against patterns with the same content
+        # signature, using key sets built once at insert
+        self._pattern_index = {}
+        # Best SUGGESTION_COUNT (pattern_type, pattern) pairs per user and per
+        # global pattern type. A pattern's rank only ever grows, so a pattern
+        # outside a top list can only enter it when it is itself recorded
+        self._top_patterns = {}
 
     def update_user_preferences(self, user_id: str, preferences: Dict[str, Any]):
         """Update user preferences"""
@@ -44,99 +81,114 @@ class LongTermMemory:
 
     def learn_from_pattern(self, pattern_type: str, pattern_data: Dict[str, Any]):
         """Learn from user patterns"""
+        pattern_type = intern_name(pattern_type)
         if pattern_type not in self.learning_patterns:
             self.learning_patterns[pattern_type] = []
 
-        pattern_entry = {
-            'data': pattern_data,
-            'timestamp': datetime.now().isoformat(),
-            'frequency': 1
-        }
-
-        # Check if similar pattern exists
-        for existing_pattern in self.learning_patterns[pattern_type]:
-            if self._patterns_similar(existing_pattern['data'], pattern_data):
-                existing_pattern['frequency'] += 1
-                existing_pattern['last_seen'] = datetime.now().isoformat()
-                return
-
-        # Add new pattern
-        self.learning_patterns[pattern_type].append(pattern_entry)
+        pattern = self._record_pattern(
+            (None, pattern_type), self.learning_patterns[pattern_type], pattern_data)
+        self._update_top_patterns(('global', pattern_type), pattern_type, pattern)
 
     def get_learned_patterns(self, pattern_type: str) -> List[Dict[str, Any]]:
-        """Get learned patterns"""
-        return self.learning_patterns.get(pattern_type, [])
+        """Get learned patterns (with ISO 'timestamp'/'last_seen' fields)"""
+        return with_iso_timestamps(self.learning_patterns.get(pattern_type, []))
 
     def get_user_patterns(self, user_id: str) -> Dict[str, Any]:
-        """Get user-specific patterns"""
-        return self.user_patterns.get(user_id, {})
+        """Get user-specific patterns (with ISO 'timestamp'/'last_seen' fields)"""
+        return with_iso_timestamps(self.user_patterns.get(user_id, {}))
 
     def update_user_pattern(self, user_id: str, pattern_type: str, pattern_data: Dict[str, Any]):
         """Update user-specific pattern"""
+        pattern_type = intern_name(pattern_type)
         if user_id not in self.user_patterns:
             self.user_patterns[user_id] = {}
 
         if pattern_type not in self.user_patterns[user_id]:
             self.user_patterns[user_id][pattern_type] = []
 
+        pattern = self._record_pattern(
+            (user_id, pattern_type), self.user_patterns[user_id][pattern_type], pattern_data)
+        self._update_top_patterns(('user', user_id), pattern_type, pattern)
+
+    def _record_pattern(self, index_key: tuple, patterns: List[Dict[str, Any]],
+                        pattern_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Bump the frequency of a similar stored pattern, or append a new one"""
+        buckets = self._pattern_index.setdefault(index_key, {})
+        bucket = buckets.setdefault(_pattern_signature(pattern_data), [])
+        keys = frozenset(pattern_data)
+
+        # Check if similar pattern exists
+        for existing_keys, existing_pattern in bucket:
+            if self._patterns_similar(existing_pattern['data'], pattern_data,
+                                      existing_keys, keys):
+                existing_pattern['frequency'] += 1
+                existing_pattern['_last_seen'] = time.time()
+                return existing_pattern
+
+        # Add new pattern (timestamps are epoch floats, ISO-formatted on save)
         pattern_entry = {
             'data': pattern_data,
-            'timestamp': datetime.now().isoformat(),
+            '_ts': time.time(),
             'frequency': 1
         }
-
-        # Check if similar pattern exists for this user
-        for existing_pattern in self.user_patterns[user_id][pattern_type]:
-            if self._patterns_similar(existing_pattern['data'], pattern_data):
-                existing_pattern['frequency'] += 1
-                existing_pattern['last_seen'] = datetime.now().isoformat()
-                return
-
-        # Add new pattern
-        self.user_patterns[user_id][pattern_type].append(pattern_entry)
+        patterns.append(pattern_entry)
+        bucket.append((keys, pattern_entry))
+        return pattern_entry
+
+    def _update_top_patterns(self, top_key: tuple, pattern_type: str, pattern: Dict[str, Any]):
+        """Let a just-recorded pattern into its top suggestions list"""
+        top = self._top_patterns.setdefault(top_key, [])
+        if any(entry is pattern for _, entry in top):
+            return  # already listed; its rank was raised in place
+        if len(top) < SUGGESTION_COUNT:
+            top.append((pattern_type, pattern))
+            return
+        weakest = min(range(len(top)), key=lambda i: _pattern_rank(top[i][1]))
+        if _pattern_rank(pattern) > _pattern_rank(top[weakest][1]):
+            top[weakest] = (pattern_type, pattern)
 
     def get_smart_suggestions(self, user_id: str, context: str) -> List[Dict[str, Any]]:
         """Get smart suggestions based on learned patterns"""
-        suggestions = []
-
-        # Get user patterns
-        user_patterns = self.get_user_patterns(user_id)
-
-        # Get global patterns
-        global_patterns = self.get_learned_patterns(context)
-
-        # Combine and rank suggestions
+        # Only the user's and the context's top patterns can make the cut
         all_patterns = []
 
-        for pattern_type, patterns in user_patterns.items():
-            for pattern in patterns:
-                all_patterns.append({
-                    'type': 'user',
-                    'pattern_type': pattern_type,
-                    'data': pattern['data'],
-                    'frequency': pattern['frequency'],
-                    'last_seen': pattern.get('last_seen', pattern['timestamp'])
-                })
-
-        for pattern in global_patterns:
+        for pattern_type, pattern in self._top_patterns.get(('user', user_id), ()):
+            all_patterns.append({
+                'type': 'user',
+                'pattern_type': pattern_type,
+                'data': pattern['data'],
+                'frequency': pattern['frequency'],
+                'last_seen': pattern.get('_last_seen', pattern['_ts'])
+            })
+
+        for _, pattern in self._top_patterns.get(('global', context), ()):
             all_patterns.append({
                 'type': 'global',
                 'pattern_type': context,
                 'data': pattern['data'],
                 'frequency': pattern['frequency'],
-                'last_seen': pattern.get('last_seen', pattern['timestamp'])
+                'last_seen': pattern.get('_last_seen', pattern['_ts'])
             })
 
         # Sort by frequency and recency
         all_patterns.sort(key=lambda x: (
             x['frequency'], x['last_seen']), reverse=True)
 
-        return all_patterns[:5]  # Top 5 suggestions
+        top = all_patterns[:SUGGESTION_COUNT]
+        for suggestion in top:
+            suggestion['last_seen'] = format_timestamp(suggestion['last_seen'])
+        return top
 
-    def _patterns_similar(self, pattern1: Dict[str, Any], pattern2: Dict[str, Any]) -> bool:
-        """Check if two patterns are similar"""
+    def _patterns_similar(self, pattern1: Dict[str, Any], pattern2: Dict[str, Any],
+                          keys1: Optional[frozenset] = None,
+                          keys2: Optional[frozenset] = None) -> bool:
+        """Check if two patterns are similar (key sets may be passed in precomputed)"""
         # Simple similarity check - can be enhanced
-        common_keys = set(pattern1.keys()) & set(pattern2.keys())
+        if keys1 is None:
+            keys1 = frozenset(pattern1)
+        if keys2 is None:
+            keys2 = frozenset(pattern2)
+        common_keys = keys1 & keys2
         if len(common_keys) == 0:
             return False
 
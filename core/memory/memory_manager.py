@@ -2,32 +2,88 @@
 Memory Manager - Orchestrates all memory operations
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from .short_term import ShortTermMemory
 from .long_term import LongTermMemory
-from .store import MemoryStore
+from .store import HOT_FILE_EXT, MemoryStore, intern_name
 from .cache import MemoryCache
 
 
+# Shared by every MemoryManager: one is created per turn, so a per-instance
+# pool would leave threads behind
+_io_executor = None
+_io_executor_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="memory-io")
+    return _io_executor
+
+
+# Serializes preloads so concurrent session starts parse each file once;
+# later callers get MemoryStore's cached parse
+_preload_lock = threading.Lock()
+
+# Files reported by get_memory_stats
+STORE_FILES = ("short_term" + HOT_FILE_EXT, "long_term.json",
+               "user_preferences.json", "conversation_history" + HOT_FILE_EXT)
+
+
 class MemoryManager:
     """Orchestrates all memory operations"""
 
-    def __init__(self, store: Optional[MemoryStore] = None, cache: Optional[MemoryCache] = None):
+    def __init__(self, store: Optional[MemoryStore] = None, cache: Optional[MemoryCache] = None,
+                 preload: bool = False):
         self.store = store or MemoryStore()
         self.cache = cache or MemoryCache()
         self.short_term = ShortTermMemory()
         self.long_term = LongTermMemory()
+        if preload:
+            self.preload()
+
+    def preload(self):
+        """Warm the cache and long-term memory from the store in one pass"""
+        with _preload_lock:
+            prefs = self.store.load_user_preferences()
+            long_term = self.store.load_long_term()
+
+        for user_id, user_prefs in prefs.items():
+            self.cache.cache_user_preferences(user_id, user_prefs)
+
+        self.long_term.user_preferences.update(
+            long_term.get("user_preferences", {}))
+        self.long_term.project_context.update(
+            long_term.get("project_context", {}))
+        for project_id, context in self.long_term.project_context.items():
+            self.cache.cache_project_context(project_id, context)
 
     def load_memory_context(self, session_id: str = "default") -> Dict[str, Any]:
         """Load all memory context for a session"""
         context = {}
 
+        # User preferences are the only lookup that can fall through to a
+        # file read; on a cache miss, read them in the background while the
+        # in-memory lookups below run
+        prefs_future = None
+        cached_prefs = self.cache.get_user_preferences("default_user")
+        if not cached_prefs:
+            prefs_future = _get_io_executor().submit(
+                self.get_user_preferences, "default_user")
+
         # Load conversation context
         context["conversation_context"] = self.get_conversation_context(
             session_id)
 
         # Load user preferences
-        context["user_preferences"] = self.get_user_preferences("default_user")
+        context["user_preferences"] = (
+            prefs_future.result() if prefs_future else cached_prefs)
 
         # Load project context
         context["project_context"] = self.get_project_context(
@@ -123,7 +179,7 @@ class MemoryManager:
     def update_learning_patterns(self, state: Dict[str, Any]):
         """Update learning patterns from state"""
         # Extract learning data
-        action = state.get("action", "")
+        action = intern_name(state.get("action", ""))
         parameters = state.get("parameters", {})
         success = state.get("success", False)
 
@@ -178,18 +234,19 @@ class MemoryManager:
     def _get_store_file_stats(self) -> Dict[str, Any]:
         """Get store file statistics"""
         import os
-        memory_dir = self.store.memory_dir
-
-        stats = {}
-        for filename in ["short_term.json", "long_term.json", "user_preferences.json", "conversation_history.json"]:
-            filepath = os.path.join(memory_dir, filename)
-            if os.path.exists(filepath):
-                stats[filename] = {
-                    "exists": True,
-                    "size": os.path.getsize(filepath)
-                }
-            else:
-                stats[filename] = {"exists": False, "size": 0}
 
-        return stats
+        stats = {filename: {"exists": False, "size": 0}
+                 for filename in STORE_FILES}
+        # One directory scan instead of exists/getsize calls per file
+        try:
+            with os.scandir(self.store.memory_dir) as entries:
+                for entry in entries:
+                    if entry.name in stats and entry.is_file():
+                        stats[entry.name] = {
+                            "exists": True,
+                            "size": entry.stat().st_size
+                        }
+        except FileNotFoundError:
+            pass
 
+        return stats
@@ -3,8 +3,12 @@ Short-term memory for CloudAgentra
 Handles session-based memory and recent context
 """
 
+import time
+from collections import deque
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from .store import format_timestamp, intern_name, with_iso_timestamps
 
 
 class ShortTermMemory:
@@ -12,39 +16,35 @@ class ShortTermMemory:
 
     def __init__(self):
         self.session_data = {}
-        self.conversation_history = []
-        self.recent_actions = []
+        # Bounded ring buffers: appending past maxlen drops the oldest entry
+        self.conversation_history = deque(maxlen=20)  # last 20 turns
+        self.recent_actions = deque(maxlen=10)  # last 10 actions
         self.current_context = {}
 
     def add_conversation_turn(self, turn_data: Dict[str, Any]):
         """Add a conversation turn to short-term memory"""
-        turn_data['timestamp'] = datetime.now().isoformat()
+        turn_data['_ts'] = time.time()
+        for key in ('intent', 'action'):
+            if key in turn_data:
+                turn_data[key] = intern_name(turn_data[key])
         self.conversation_history.append(turn_data)
 
-        # Keep only last 20 turns in memory
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
-
     def get_conversation_context(self) -> Dict[str, Any]:
         """Get current conversation context"""
         return {
-            "recent_turns": self.conversation_history[-5:],  # Last 5 turns
+            "recent_turns": with_iso_timestamps(list(self.conversation_history)[-5:]),  # Last 5 turns
             "total_turns": len(self.conversation_history),
-            "session_start": self.conversation_history[0]['timestamp'] if self.conversation_history else None
+            "session_start": format_timestamp(self.conversation_history[0]['_ts']) if self.conversation_history else None
         }
 
     def add_recent_action(self, action_data: Dict[str, Any]):
         """Add a recent action to memory"""
-        action_data['timestamp'] = datetime.now().isoformat()
+        action_data['_ts'] = time.time()
         self.recent_actions.append(action_data)
 
-        # Keep only last 10 actions
-        if len(self.recent_actions) > 10:
-            self.recent_actions = self.recent_actions[-10:]
-
     def get_recent_actions(self) -> List[Dict[str, Any]]:
         """Get recent actions from memory"""
-        return self.recent_actions[-5:]  # Last 5 actions
+        return with_iso_timestamps(list(self.recent_actions)[-5:])  # Last 5 actions
 
     def update_context(self, context_data: Dict[str, Any]):
         """Update current context"""
@@ -75,17 +75,15 @@ class ShortTermMemory:
         if not self.conversation_history:
             return None
 
-        start_time = datetime.fromisoformat(
-            self.conversation_history[0]['timestamp'])
-        end_time = datetime.now()
-        duration = end_time - start_time
+        start_time = self.conversation_history[0]['_ts']
+        duration = timedelta(seconds=time.time() - start_time)
 
         return str(duration)
 
     def _extract_recent_topics(self) -> List[str]:
         """Extract recent topics from conversation"""
         topics = []
-        for turn in self.conversation_history[-5:]:
+        for turn in list(self.conversation_history)[-5:]:
             if 'intent' in turn:
                 topics.append(turn['intent'])
         return list(set(topics))  # Remove duplicates
@@ -2,14 +2,250 @@
 Memory Store - Handles persistent storage of memory data
 """
 
+import atexit
+import functools
 import json
+import logging
 import os
+import sys
+import threading
+import time
+from collections import deque
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional, faster JSON for the memory files
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional binary format for the frequently rewritten files
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Short-term memory and conversation history are rewritten often; with
+# msgpack installed they are stored as compact binary instead of indented
+# JSON. Preferences and long-term memory stay JSON for human inspection.
+HOT_FILE_EXT = ".msgpack" if msgpack else ".json"
+
+
+# In-memory records keep float epoch timestamps under these keys; they are
+# written out as ISO strings under the public names
+_TIMESTAMP_KEYS = {'_ts': 'timestamp', '_last_seen': 'last_seen'}
+
+
+@functools.lru_cache(maxsize=256)
+def format_timestamp(ts: float) -> str:
+    """ISO-format an epoch timestamp"""
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def intern_name(value: Any) -> Any:
+    """Intern action/intent names, which repeat across many memory records"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _retry(max_attempts: int = 3, backoff: float = 0.05):
+    """
+    Retry a file operation on transient errors (OSError, or a parse error
+    from reading a file mid-write), sleeping backoff, 2*backoff, ... between
+    attempts. A missing file is not retried.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except FileNotFoundError:
+                    raise
+                except (OSError, ValueError) as e:
+                    if attempt == max_attempts:
+                        raise
+                    logger.warning("%s failed (attempt %d/%d): %s",
+                                   func.__name__, attempt, max_attempts, e)
+                    time.sleep(backoff * 2 ** (attempt - 1))
+        return wrapper
+    return decorator
+
+
+def _dump_json(data: Any) -> bytes:
+    # default=str keeps arbitrary state values (results, clients) writable
+    if orjson:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2
+                            | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
+
+def _parse_json(raw: bytes) -> Any:
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+@_retry()
+def _write_json(file_path: str, data: Any) -> bytes:
+    """Write data as JSON and return the bytes written"""
+    raw = _dump_json(data)
+    with open(file_path, 'wb') as f:
+        f.write(raw)
+    return raw
+
+
+@_retry()
+def _read_json_bytes(file_path: str) -> Any:
+    """Read a JSON file; returns (raw bytes, parsed data)"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return raw, _parse_json(raw)
+
+
+def _read_json(file_path: str) -> Any:
+    return _read_json_bytes(file_path)[1]
+
+
+@_retry()
+def _write_msgpack(file_path: str, data: Any):
+    with open(file_path, 'wb') as f:
+        f.write(msgpack.packb(data, default=str))
+
+
+@_retry()
+def _read_msgpack(file_path: str) -> Any:
+    with open(file_path, 'rb') as f:
+        return msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+
+
+def _write_hot(file_path: str, data: Any):
+    if file_path.endswith(".msgpack"):
+        _write_msgpack(file_path, data)
+    else:
+        _write_json(file_path, data)
+
+
+def _read_hot(file_path: str) -> Any:
+    if file_path.endswith(".msgpack"):
+        return _read_msgpack(file_path)
+    return _read_json(file_path)
+
+
+# Last contents of each preferences/long-term file, keyed by absolute path
+# and reused while the file's mtime and size are unchanged. The raw bytes
+# are kept and parsed on every load, so each caller gets its own objects
+# and sees exactly what the file holds. Shared by every MemoryStore, since a
+# new one is created each turn.
+_file_contents: Dict[str, tuple] = {}
+
+
+def _load_json_cached(file_path: str) -> Dict[str, Any]:
+    """Parsed file contents ({} if missing), without re-reading an unchanged file"""
+    file_path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        _file_contents.pop(file_path, None)
+        return {}
+    cached = _file_contents.get(file_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return _parse_json(cached[2])
+    raw, data = _read_json_bytes(file_path)
+    _file_contents[file_path] = (stat.st_mtime_ns, stat.st_size, raw)
+    return data
+
+
+def _write_json_cached(file_path: str, data: Dict[str, Any]):
+    """Write data and remember the bytes written as the file's contents"""
+    file_path = os.path.abspath(file_path)
+    raw = _write_json(file_path, data)
+    stat = os.stat(file_path)
+    _file_contents[file_path] = (stat.st_mtime_ns, stat.st_size, raw)
+
+
+def with_iso_timestamps(obj: Any) -> Any:
+    """Copy of obj with float timestamps converted to ISO strings (for saving and readers)"""
+    if isinstance(obj, dict):
+        converted = {}
+        for key, value in obj.items():
+            if key in _TIMESTAMP_KEYS:
+                converted[_TIMESTAMP_KEYS[key]] = format_timestamp(value)
+            else:
+                converted[key] = with_iso_timestamps(value)
+        return converted
+    if isinstance(obj, (list, tuple, deque)):
+        return [with_iso_timestamps(v) for v in obj]
+    return obj
+
+
+# conversation_history is written behind: turns are buffered per file
+# (shared by every MemoryStore on the same directory) and the file is
+# rewritten after FLUSH_EVERY_TURNS turns, or by a timer at most
+# FLUSH_INTERVAL seconds after the last write, and at exit
+MAX_CONVERSATION_HISTORY = 50
+FLUSH_EVERY_TURNS = 10
+FLUSH_INTERVAL = 5.0
+
+
+class _ConversationLog:
+    """Buffered conversation history for one file"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.history = None  # loaded on first use
+        self.pending = 0
+        self.last_flush = 0.0  # so the first turn is written straight away
+        self.lock = threading.Lock()
+        self.timer = None  # flushes buffered turns if no new turn arrives
+
+    def schedule_flush(self):
+        """Make sure buffered turns are written within FLUSH_INTERVAL (lock held)"""
+        if self.timer is not None:
+            return
+        delay = max(0.0, FLUSH_INTERVAL - (time.monotonic() - self.last_flush))
+        self.timer = threading.Timer(delay, self._timed_flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _timed_flush(self):
+        with self.lock:
+            self.timer = None
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error flushing conversation history")
+
+    def flush(self):
+        """Write the history atomically if it has unsaved turns (lock held)"""
+        if not self.pending:
+            return
+        root, ext = os.path.splitext(self.file_path)
+        tmp_path = root + ".tmp" + ext
+        _write_hot(tmp_path, self.history)
+        os.replace(tmp_path, self.file_path)
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+
+_conversation_logs: Dict[str, _ConversationLog] = {}
+_conversation_logs_lock = threading.Lock()
+
+
+def _flush_conversation_logs():
+    for log in list(_conversation_logs.values()):
+        with log.lock:
+            try:
+                log.flush()
+            except Exception:
+                logger.exception("Error flushing conversation history")
+
+
+atexit.register(_flush_conversation_logs)
+
 
 class MemoryStore:
-    """Handles persistent storage of memory data to JSON files"""
+    """Handles persistent storage of memory data to JSON (and msgpack) files"""
 
     def __init__(self, memory_dir: str = "memory"):
         self.memory_dir = memory_dir
@@ -20,77 +256,103 @@ class MemoryStore:
         if not os.path.exists(self.memory_dir):
             os.makedirs(self.memory_dir)
 
+    def _hot_file(self, name: str) -> str:
+        """
+        Path of a frequently rewritten file. When msgpack is in use and only
+        the older JSON file exists, it is converted once and removed.
+        """
+        file_path = os.path.join(self.memory_dir, name + HOT_FILE_EXT)
+        json_path = os.path.join(self.memory_dir, name + ".json")
+        if (HOT_FILE_EXT != ".json" and not os.path.exists(file_path)
+                and os.path.exists(json_path)):
+            try:
+                _write_hot(file_path, _read_json(json_path))
+                os.remove(json_path)
+            except Exception:
+                logger.exception("Error migrating %s to msgpack", json_path)
+        return file_path
+
     def save_short_term(self, data: Dict[str, Any]) -> bool:
-        """Save short-term memory to JSON file"""
+        """Save short-term memory"""
         try:
-            file_path = os.path.join(self.memory_dir, "short_term.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str)
+            file_path = self._hot_file("short_term")
+            _write_hot(file_path, with_iso_timestamps(data))
             return True
-        except Exception as e:
-            print(f"Error saving short-term memory: {e}")
+        except Exception:
+            logger.exception("Error saving short-term memory")
             return False
 
     def load_short_term(self) -> Dict[str, Any]:
-        """Load short-term memory from JSON file"""
+        """Load short-term memory"""
         try:
-            file_path = os.path.join(self.memory_dir, "short_term.json")
+            file_path = self._hot_file("short_term")
             if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return _read_hot(file_path)
             return {}
-        except Exception as e:
-            print(f"Error loading short-term memory: {e}")
+        except Exception:
+            logger.exception("Error loading short-term memory")
             return {}
 
     def save_long_term(self, data: Dict[str, Any]) -> bool:
         """Save long-term memory to JSON file"""
         try:
             file_path = os.path.join(self.memory_dir, "long_term.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str)
+            _write_json_cached(file_path, with_iso_timestamps(data))
             return True
-        except Exception as e:
-            print(f"Error saving long-term memory: {e}")
+        except Exception:
+            logger.exception("Error saving long-term memory")
             return False
 
     def load_long_term(self) -> Dict[str, Any]:
-        """Load long-term memory from JSON file"""
+        """Load long-term memory from JSON file (cached until the file changes)"""
         try:
             file_path = os.path.join(self.memory_dir, "long_term.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading long-term memory: {e}")
+            return _load_json_cached(file_path)
+        except Exception:
+            logger.exception("Error loading long-term memory")
             return {}
 
     def save_user_preferences(self, data: Dict[str, Any]) -> bool:
         """Save user preferences to JSON file"""
         try:
             file_path = os.path.join(self.memory_dir, "user_preferences.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str)
+            _write_json_cached(file_path, data)
             return True
-        except Exception as e:
-            print(f"Error saving user preferences: {e}")
+        except Exception:
+            logger.exception("Error saving user preferences")
             return False
 
     def load_user_preferences(self) -> Dict[str, Any]:
-        """Load user preferences from JSON file"""
+        """Load user preferences from JSON file (cached until the file changes)"""
         try:
             file_path = os.path.join(self.memory_dir, "user_preferences.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading user preferences: {e}")
+            return _load_json_cached(file_path)
+        except Exception:
+            logger.exception("Error loading user preferences")
             return {}
 
+    def _conversation_log(self) -> _ConversationLog:
+        file_path = os.path.abspath(os.path.join(
+            self.memory_dir, "conversation_history" + HOT_FILE_EXT))
+        with _conversation_logs_lock:
+            log = _conversation_logs.get(file_path)
+            if log is None:
+                self._hot_file("conversation_history")
+                log = _conversation_logs[file_path] = _ConversationLog(
+                    file_path)
+        return log
+
+    def _read_conversation_history(self, file_path: str) -> list:
+        try:
+            if os.path.exists(file_path):
+                return _read_hot(file_path)
+            return []
+        except Exception:
+            logger.exception("Error loading conversation history")
+            return []
+
     def save_conversation_turn(self, state: Dict[str, Any]) -> bool:
-        """Save a conversation turn to memory"""
+        """Save a conversation turn to memory (written to disk in batches)"""
         try:
             # Extract conversation data from state
             conversation_data = {
@@ -103,35 +365,43 @@ class MemoryStore:
                 "success": state.get("success", False)
             }
 
-            # Load existing conversation history
-            conversation_history = self.load_conversation_history()
-            conversation_history.append(conversation_data)
+            log = self._conversation_log()
+            with log.lock:
+                if log.history is None:
+                    log.history = self._read_conversation_history(
+                        log.file_path)
+                log.history.append(conversation_data)
 
-            # Keep only last 50 conversations
-            if len(conversation_history) > 50:
-                conversation_history = conversation_history[-50:]
+                # Keep only last 50 conversations
+                del log.history[:-MAX_CONVERSATION_HISTORY]
 
-            # Save updated history
-            file_path = os.path.join(
-                self.memory_dir, "conversation_history.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(conversation_history, f, indent=2, default=str)
+                log.pending += 1
+                if (log.pending >= FLUSH_EVERY_TURNS
+                        or time.monotonic() - log.last_flush >= FLUSH_INTERVAL):
+                    log.flush()
+                else:
+                    log.schedule_flush()
 
             return True
-        except Exception as e:
-            print(f"Error saving conversation turn: {e}")
+        except Exception:
+            logger.exception("Error saving conversation turn")
             return False
 
-    def load_conversation_history(self) -> list:
-        """Load conversation history from JSON file"""
+    def flush(self) -> bool:
+        """Write any buffered conversation turns to disk now"""
+        log = self._conversation_log()
         try:
-            file_path = os.path.join(
-                self.memory_dir, "conversation_history.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
-        except Exception as e:
-            print(f"Error loading conversation history: {e}")
-            return []
+            with log.lock:
+                log.flush()
+            return True
+        except Exception:
+            logger.exception("Error flushing conversation history")
+            return False
 
+    def load_conversation_history(self) -> list:
+        """Load conversation history, including turns not yet written"""
+        log = self._conversation_log()
+        with log.lock:
+            if log.history is not None:
+                return list(log.history)
+        return self._read_conversation_history(log.file_path)
@@ -1,13 +1,17 @@
 # core/prompts.py
+import functools
 import os
 
 PROMPTS_DIR = os.path.abspath(os.path.join(
     os.path.dirname(__file__), '..', 'prompts'))
 
 
+@functools.lru_cache(maxsize=128)
 def load_prompt(name: str) -> str:
     """
     Loads a prompt from the /prompts directory.
+    Prompts are read once per process; call load_prompt.cache_clear() to
+    pick up edited prompt files without restarting.
     Args:
         name: The name of the prompt file (without the .md extension).
     Returns:
@@ -115,6 +115,7 @@ class AgentState(TypedDict, total=False):
     conversation_context: Optional[Dict[str, Any]]
     recent_actions: Optional[List[Dict[str, Any]]]
     memory_manager: Optional[Any]  # Memory manager instance
+    memory_context_loaded: bool  # Memory context loaded for this turn
 
     # --- Safety & Loop Prevention ---
     recursion_count: int  # Track number of node executions
@@ -77,7 +77,7 @@ class StateCleanupManager:
         total_size_freed = 0
 
         for filename in os.listdir(memory_dir):
-            if filename.endswith('.json'):
+            if filename.endswith(('.json', '.msgpack')):
                 filepath = os.path.join(memory_dir, filename)
                 file_mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
 
@@ -7,10 +7,10 @@ from core.state import AgentState
 from core.memory.memory_manager import MemoryManager
 
 
-def memory_context_node(state: AgentState) -> Dict[str, Any]:
+def load_memory_context(state: AgentState) -> Dict[str, Any]:
     """
-    Load memory context at the start of each conversation turn
-    This node runs first to provide context to all other nodes
+    Load memory context for the current turn and return the state update.
+    Errors are swallowed so a turn can always continue without memory.
     """
     print("🧠 Memory Context: Loading memory context...")
 
@@ -24,36 +24,44 @@ def memory_context_node(state: AgentState) -> Dict[str, Any]:
         # Load all memory context
         memory_context = memory_manager.load_memory_context(session_id)
 
-        # Update state with memory context
-        state.update({
+        update = {
             "conversation_context": memory_context.get("conversation_context", {}),
             "user_preferences": memory_context.get("user_preferences", {}),
             "project_context": memory_context.get("project_context", {}),
             "recent_actions": memory_context.get("recent_actions", []),
             "memory_manager": memory_manager,
             "session_id": session_id
-        })
+        }
 
         print(f"🧠 Memory Context: Loaded context for session {session_id}")
         print(
-            f"🧠 Memory Context: Recent actions: {len(state.get('recent_actions', []))}")
+            f"🧠 Memory Context: Recent actions: {len(update['recent_actions'])}")
         print(
-            f"🧠 Memory Context: User preferences: {len(state.get('user_preferences', {}))}")
+            f"🧠 Memory Context: User preferences: {len(update['user_preferences'])}")
 
-        return {
-            "next_step": "supervisor",
-            **state
-        }
+        return update
 
     except Exception as e:
         print(f"🧠 Memory Context: Error loading memory context: {e}")
-        # Continue without memory context if there's an error
-        return {
-            "next_step": "supervisor",
+        # Continue without memory context if there's an error, keeping
+        # whatever the state already carries
+        defaults = {
             "conversation_context": {},
             "user_preferences": {},
             "project_context": {},
             "recent_actions": [],
-            **state
         }
+        return {key: value for key, value in defaults.items() if key not in state}
+
 
+def memory_context_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Load memory context at the start of each conversation turn.
+    The graph now loads memory inside supervisor_node; this node is kept
+    for callers that still wire it in separately.
+    """
+    return {
+        "next_step": "supervisor",
+        **state,
+        **load_memory_context(state),
+    }
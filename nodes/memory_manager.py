@@ -12,6 +12,9 @@ def memory_manager_node(state: AgentState) -> Dict[str, Any]:
     Save memory at the end of each conversation turn
     This node runs last to save all learned information
     """
+    if state.get("memory_saved") is not None:
+        return {}
+
     print("💾 Memory Manager: Saving memory...")
 
     try:
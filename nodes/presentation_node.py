@@ -2,7 +2,7 @@
 from core.state import AgentState
 from core.prompts import load_prompt
 from core.llm_manager import call_llm as default_call_llm
-from core.fast_error_handler import FastErrorHandler
+from core.fast_error_handler import get_error_handler
 from typing import Dict, Any, List
 import json
 # Import the official OCI SDK utility for object-to-dictionary conversion.
@@ -755,7 +755,7 @@ def _handle_plan_error(state: AgentState, call_llm_func) -> dict:
             pass
 
         error = PlanError(plan_error)
-        error_handler = FastErrorHandler()
+        error_handler = get_error_handler()
         call_llm_func = state.get("call_llm", default_call_llm)
         error_response = error_handler.handle_error(
             error, state, "planning", call_llm_func)
@@ -2,6 +2,7 @@ from core.fast_error_handler import handle_node_error
 from core.llm_manager import call_llm as default_call_llm
 from core.prompts import load_prompt
 from core.state import AgentState
+from nodes.memory_context import load_memory_context
 import re
 import json
 # nodes/supervisor.py
@@ -186,6 +187,19 @@ Respond with ONLY a JSON object in this exact format:
 def supervisor_node(state: AgentState) -> dict:
     """
     LLM-powered supervisor node - Intelligent routing and state management.
+    Loads memory context on the first pass of each turn, then routes.
+    """
+    if state.get("memory_context_loaded"):
+        return _supervise(state)
+
+    memory_update = load_memory_context(state)
+    memory_update["memory_context_loaded"] = True
+    state.update(memory_update)
+    return {**memory_update, **_supervise(state)}
+
+
+def _supervise(state: AgentState) -> dict:
+    """
     Uses LLM to analyze context and make intelligent routing decisions.
     """
     # Safety check: Prevent infinite loops
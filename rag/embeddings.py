@@ -7,6 +7,7 @@ import json
 from typing import List, Dict, Any, Optional
 from functools import lru_cache
 import time
+import threading
 
 # Load environment variables early
 try:
@@ -22,6 +23,9 @@ class EmbeddingManager:
     def __init__(self):
         self.cache = {}
         self.cache_file = "rag/embedding_cache.json"
+        # Guards cache mutation and the on-disk write; the tenancy scanner
+        # embeds from several worker threads at once
+        self._lock = threading.Lock()
         self.load_cache()
 
     def load_cache(self):
@@ -141,8 +145,9 @@ class EmbeddingManager:
         # Cache the result
         if embedding and use_cache:
             text_hash = self.get_text_hash(text)
-            self.cache[text_hash] = embedding
-            self.save_cache()
+            with self._lock:
+                self.cache[text_hash] = embedding
+                self.save_cache()
 
         # Fallback to dummy embedding
         if not embedding:
@@ -4,15 +4,20 @@ import oci
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from core.state import AgentState
 from oci_ops.clients import get_client
 from oci_ops.pagination import get_all_items
-from rag.embeddings import get_embedding
-from rag.vectorstore import add_to_store
+from rag.embeddings import get_embedding, get_embedding_manager
+from rag.vectorstore import add_to_store, get_vector_store
 
 SCAN_TS = lambda: datetime.now(timezone.utc).isoformat()
 
+# Compartments are scanned concurrently; the cap keeps us well inside OCI's
+# per-tenancy API rate limits.
+DEFAULT_SCAN_WORKERS = 8
+
 # (CANONICAL_TYPE and other constants remain the same)
 CANONICAL_TYPE: Dict[Tuple[str, str], str] = {
     ("identity", "list_users"): "user",
@@ -199,9 +204,10 @@ def _list_all_compartments(state: AgentState) -> List[Dict[str, Any]]:
         return [{"id": tenancy_id, "name": "Tenancy Root"}] if tenancy_id else []
 
 
-def master_tenancy_scan(state: AgentState) -> Dict[str, Any]:
+def master_tenancy_scan(state: AgentState, max_workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Any]:
     """
-    Full tenancy deep scan.
+    Full tenancy deep scan. Compartments are scanned in parallel on up to
+    max_workers threads since the work is bound by OCI API round-trips.
     """
     print("🔍 Master Tenancy Deep Scan - START")
     creds = state.get("oci_creds", {})
@@ -238,21 +244,32 @@ def master_tenancy_scan(state: AgentState) -> Dict[str, Any]:
         ("loadbalancer", "list_load_balancers"),
     ]
 
-    all_docs = []
-
-    for comp in compartments:
+    def scan_one_compartment(comp: Dict[str, Any]) -> List[Dict[str, Any]]:
         print(f"📦 Scanning compartment: {comp.get('name')}, ({comp.get('id')})")
+        docs = []
         if namespace:
-            all_docs.extend(_scan_object_storage(state, [comp], namespace))
+            docs.extend(_scan_object_storage(state, [comp], namespace))
         for service, op in compartment_services_plan:
             try:
                 if (service, op) in AD_REQUIRED and ads:
                     for ad in ads:
-                        all_docs.extend(_scan_generic_service(state, service, op, comp["id"], ad=ad))
+                        docs.extend(_scan_generic_service(state, service, op, comp["id"], ad=ad))
                 else:
-                    all_docs.extend(_scan_generic_service(state, service, op, comp["id"]))
+                    docs.extend(_scan_generic_service(state, service, op, comp["id"]))
             except Exception as e:
                 print(f"{service}.{op} scan failed for {comp['id']}: {e}")
+        return docs
+
+    # Initialise the shared singletons up front so worker threads don't race
+    # to create them
+    get_embedding_manager()
+    get_vector_store()
+
+    all_docs = []
+    workers = max(1, min(max_workers, len(compartments)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for docs in executor.map(scan_one_compartment, compartments):
+            all_docs.extend(docs)
 
     # Scan tenancy-level services
     print("📦 Scanning tenancy-level services...")
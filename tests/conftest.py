@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Let the tests import the app's packages (core, nodes, ...) from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,70 @@
+import gc
+import weakref
+
+import pytest
+
+from core.enhanced_intent_analyzer import EnhancedIntentAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return EnhancedIntentAnalyzer()
+
+
+@pytest.mark.parametrize("query, pattern", [
+    ("list instances", "list_instances"),
+    ("list buckets", "list_buckets"),
+    ("show vcns", "list_vcns"),
+])
+def test_direct_fetch_patterns_are_high_confidence(analyzer, query, pattern):
+    result = analyzer._quick_analysis(query)
+    assert result.execution_type == "DIRECT_FETCH"
+    assert result.confidence == "high"
+    assert result.matched_pattern == pattern
+
+
+@pytest.mark.parametrize("query, pattern", [
+    ("list vms", "list_instances"),
+    ("show my disks", "list_volumes"),
+])
+def test_single_resource_with_template_is_medium_direct_fetch(analyzer, query, pattern):
+    result = analyzer._quick_analysis(query)
+    assert result.execution_type == "DIRECT_FETCH"
+    assert result.confidence == "medium"
+    assert result.matched_pattern == pattern
+
+
+@pytest.mark.parametrize("query", [
+    "list subnets in vcn",  # two resources: must not pick the vcn template
+    "list databases",       # no list template for these
+    "list route tables",
+    "list policies",
+    "list adb",
+])
+def test_unmatched_list_queries_go_to_llm(analyzer, query):
+    result = analyzer._quick_analysis(query)
+    assert result.execution_type == "UNKNOWN"
+    assert result.confidence == "low"
+    assert result.matched_pattern is None
+
+
+def test_quick_analysis_is_cached_per_normalized_query(analyzer):
+    first = analyzer._quick_analysis("List Instances")
+    second = analyzer._quick_analysis("  list instances ")
+
+    assert second is first
+    info = analyzer._cached_quick_analysis.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_quick_analysis_cache_is_per_instance():
+    first, second = EnhancedIntentAnalyzer(), EnhancedIntentAnalyzer()
+    first._quick_analysis("list buckets")
+
+    assert second._cached_quick_analysis.cache_info().currsize == 0
+
+    # The cache does not keep its analyzer alive
+    ref = weakref.ref(first)
+    del first
+    gc.collect()
+    assert ref() is None
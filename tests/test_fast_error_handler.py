@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from core.fast_error_handler import MAX_LEARNED_PATTERNS, FastErrorHandler
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return FastErrorHandler()
+
+
+def learned_errors(error_handler):
+    with open(error_handler.learning_file, 'rb') as f:
+        return [json.loads(line)["error"] for line in f]
+
+
+def test_learning_file_stays_bounded(handler):
+    total = MAX_LEARNED_PATTERNS * 3 + 7
+    for i in range(total):
+        handler._log_successful_pattern(f"error {i}", "Please try again", "planner")
+        assert len(learned_errors(handler)) < 2 * MAX_LEARNED_PATTERNS
+
+    errors = learned_errors(handler)
+    assert errors[-1] == f"error {total - 1}"
+    assert errors == [f"error {i}" for i in range(total - len(errors), total)]
+
+
+def test_existing_file_is_trimmed_on_start(handler):
+    for i in range(MAX_LEARNED_PATTERNS + 20):
+        handler._log_successful_pattern(f"error {i}", "Please try again", "planner")
+
+    restarted = FastErrorHandler()
+
+    errors = learned_errors(restarted)
+    assert len(errors) == MAX_LEARNED_PATTERNS
+    assert errors[-1] == f"error {MAX_LEARNED_PATTERNS + 19}"
+
+
+def test_learning_stats_count_recent_patterns(handler):
+    for i in range(3):
+        handler._log_successful_pattern(f"error {i}", "Please retry", "codegen")
+
+    stats = handler.get_learning_stats()
+
+    assert stats["total_patterns"] == 3
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from core.memory.long_term import SUGGESTION_COUNT, LongTermMemory
+
+
+@pytest.fixture
+def memory():
+    return LongTermMemory()
+
+
+def test_repeated_pattern_bumps_frequency(memory):
+    memory.learn_from_pattern("list", {"resource": "instances", "compartment": "dev"})
+    memory.learn_from_pattern("list", {"compartment": "dev", "resource": "instances"})
+    memory.learn_from_pattern("list", {"resource": "buckets", "compartment": "dev"})
+
+    patterns = memory.get_learned_patterns("list")
+    assert [p["frequency"] for p in patterns] == [2, 1]
+    assert "last_seen" in patterns[0] and "last_seen" not in patterns[1]
+
+
+def test_patterns_are_indexed_by_signature(memory):
+    memory.update_user_pattern("alice", "list", {"resource": "instances"})
+    memory.update_user_pattern("alice", "list", {"resource": "volumes"})
+    memory.update_user_pattern("alice", "list", {"resource": "instances"})
+    memory.update_user_pattern("bob", "list", {"resource": "instances"})
+
+    alice_buckets = memory._pattern_index[("alice", "list")]
+    assert len(alice_buckets) == 2
+    assert sorted(len(bucket) for bucket in alice_buckets.values()) == [1, 1]
+    assert len(memory._pattern_index[("bob", "list")]) == 1
+    assert memory.get_user_patterns("bob")["list"][0]["frequency"] == 1
+
+
+def test_unhashable_pattern_values_are_indexed(memory):
+    data = {"resources": ["instances", "volumes"], "filters": {"state": "RUNNING"}}
+    memory.learn_from_pattern("list", data)
+    memory.learn_from_pattern("list", {"filters": {"state": "RUNNING"},
+                                       "resources": ["instances", "volumes"]})
+
+    assert memory.get_learned_patterns("list")[0]["frequency"] == 2
+
+
+def test_accessors_return_iso_timestamps(memory):
+    memory.learn_from_pattern("list", {"resource": "instances"})
+    memory.learn_from_pattern("list", {"resource": "instances"})
+
+    pattern = memory.get_learned_patterns("list")[0]
+    assert "_ts" not in pattern and "_last_seen" not in pattern
+    assert isinstance(pattern["timestamp"], str)
+    assert isinstance(pattern["last_seen"], str)
+    # The stored record keeps its float timestamps
+    assert isinstance(memory.learning_patterns["list"][0]["_ts"], float)
+
+
+def test_smart_suggestions_match_a_full_sort(memory):
+    rng = random.Random(7)
+    for _ in range(300):
+        pattern_type = rng.choice(["list", "create", "delete"])
+        resource = f"r{rng.randrange(12)}"
+        memory.update_user_pattern("alice", pattern_type, {"resource": resource})
+
+    expected = sorted(
+        ((pattern_type, p) for pattern_type, patterns in memory.user_patterns["alice"].items()
+         for p in patterns),
+        key=lambda item: (item[1]["frequency"], item[1].get("_last_seen", item[1]["_ts"])),
+        reverse=True)[:SUGGESTION_COUNT]
+
+    suggestions = memory.get_smart_suggestions("alice", "no-such-context")
+
+    assert [(s["pattern_type"], s["data"], s["frequency"]) for s in suggestions] == [
+        (pattern_type, p["data"], p["frequency"]) for pattern_type, p in expected]
+    assert all(isinstance(s["last_seen"], str) for s in suggestions)
+
+
+def test_smart_suggestions_merge_user_and_context_patterns(memory):
+    for _ in range(3):
+        memory.update_user_pattern("alice", "list", {"resource": "instances"})
+    for _ in range(2):
+        memory.learn_from_pattern("list", {"resource": "buckets"})
+    memory.learn_from_pattern("create", {"resource": "vcns"})
+
+    suggestions = memory.get_smart_suggestions("alice", "list")
+
+    assert [(s["type"], s["data"], s["frequency"]) for s in suggestions] == [
+        ("user", {"resource": "instances"}, 3),
+        ("global", {"resource": "buckets"}, 2),
+    ]
@@ -0,0 +1,119 @@
+import pytest
+
+from core.memory import cache as cache_module
+from core.memory.cache import MemoryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    memory_cache = MemoryCache(max_size=3)
+    memory_cache._now = clock
+    return memory_cache
+
+
+def test_evicts_least_recently_used(cache):
+    for key in ("a", "b", "c"):
+        cache.cache_user_preferences(key, {"key": key})
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get_user_preferences("a") == {"key": "a"}
+    cache.cache_user_preferences("d", {"key": "d"})
+
+    assert cache.get_user_preferences("b") is None
+    assert list(cache.user_preferences_cache) == ["c", "a", "d"]
+
+
+def test_recaching_refreshes_recency(cache):
+    for key in ("a", "b", "c"):
+        cache.cache_project_context(key, {})
+    cache.cache_project_context("a", {"updated": True})
+    cache.cache_project_context("d", {})
+
+    assert cache.get_project_context("a") == {"updated": True}
+    assert cache.get_project_context("b") is None
+
+
+def test_caches_are_bounded_independently(cache):
+    for key in ("a", "b", "c", "d"):
+        cache.cache_conversation_context(key, {})
+    cache.cache_recent_actions("a", ["list_instances"])
+
+    assert len(cache.conversation_cache) == 3
+    assert cache.get_recent_actions("a") == ["list_instances"]
+    assert cache.get_recent_actions("missing") == []
+
+
+def test_expired_entry_is_dropped_on_get(cache, clock):
+    cache.cache_conversation_context("s1", {"turn": 1})
+    clock.now += cache.cache_ttl - 1
+    assert cache.get_conversation_context("s1") == {"turn": 1}
+
+    clock.now += 2
+    assert cache.get_conversation_context("s1") is None
+    assert "s1" not in cache.conversation_cache
+
+
+def test_stats_purge_expired_entries(cache, clock):
+    cache.cache_conversation_context("old", {})
+    clock.now += cache.cache_ttl / 2
+    cache.cache_user_preferences("new", {})
+    clock.now += cache.cache_ttl / 2 + 1
+
+    stats = cache.get_cache_stats()
+
+    assert stats["conversation_cache_size"] == 0
+    assert stats["user_preferences_cache_size"] == 1
+
+
+def test_recached_key_survives_purge_of_its_old_expiry(cache, clock):
+    cache.cache_conversation_context("s1", {"turn": 1})
+    clock.now += cache.cache_ttl - 1
+    cache.cache_conversation_context("s1", {"turn": 2})
+    clock.now += 2  # past the first expiry, not the second
+
+    assert cache.get_cache_stats()["conversation_cache_size"] == 1
+    assert cache.get_conversation_context("s1") == {"turn": 2}
+    assert len(cache._expiry_heap) == 1
+
+
+def test_inserts_purge_every_purge_every(clock):
+    memory_cache = MemoryCache(max_size=cache_module.PURGE_EVERY * 2)
+    memory_cache._now = clock
+    for i in range(cache_module.PURGE_EVERY - 1):
+        memory_cache.cache_conversation_context(f"s{i}", {})
+    clock.now += memory_cache.cache_ttl + 1
+
+    # Nothing is purged until the PURGE_EVERY-th insert
+    assert len(memory_cache.conversation_cache) == cache_module.PURGE_EVERY - 1
+    memory_cache.cache_user_preferences("u", {})
+
+    assert len(memory_cache.conversation_cache) == 0
+    assert memory_cache._expiry_heap == [(clock.now + memory_cache.cache_ttl,
+                                          "user_preferences", "u")]
+
+
+def test_invalidate_cache(cache):
+    cache.cache_conversation_context("s1", {})
+    cache.cache_conversation_context("s2", {})
+    cache.cache_user_preferences("u", {})
+
+    cache.invalidate_cache("conversation", "s1")
+    assert list(cache.conversation_cache) == ["s2"]
+
+    cache.invalidate_cache("all")
+    assert cache.get_cache_stats()["conversation_cache_size"] == 0
+    assert cache.get_user_preferences("u") is None
+    assert cache._expiry_heap == []
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from core.memory import store as store_module
+from core.memory.store import MemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    memory_store = MemoryStore(str(tmp_path / "memory"))
+    yield memory_store
+    # Drop this directory's buffered log so no timer outlives the test
+    log = memory_store._conversation_log()
+    with log.lock:
+        if log.timer is not None:
+            log.timer.cancel()
+    store_module._conversation_logs.pop(log.file_path, None)
+
+
+def written_turns(memory_store):
+    return memory_store._read_conversation_history(memory_store._conversation_log().file_path)
+
+
+def save_turns(memory_store, count, start=0):
+    for i in range(start, start + count):
+        assert memory_store.save_conversation_turn({"query": f"q{i}", "success": True})
+
+
+def test_first_turn_is_written_immediately(store):
+    save_turns(store, 1)
+
+    assert [turn["query"] for turn in written_turns(store)] == ["q0"]
+
+
+def test_turns_are_flushed_every_flush_every_turns(store, monkeypatch):
+    save_turns(store, 1)
+    monkeypatch.setattr(store_module, "FLUSH_INTERVAL", 3600.0)
+
+    save_turns(store, store_module.FLUSH_EVERY_TURNS - 1, start=1)
+    assert len(written_turns(store)) == 1
+
+    save_turns(store, 1, start=store_module.FLUSH_EVERY_TURNS)
+    assert len(written_turns(store)) == store_module.FLUSH_EVERY_TURNS + 1
+
+
+def test_buffered_turns_are_flushed_by_timer(store, monkeypatch):
+    save_turns(store, 1)
+    monkeypatch.setattr(store_module, "FLUSH_INTERVAL", 0.05)
+    # Pretend the first flush just happened so the next turn is buffered
+    store._conversation_log().last_flush = time.monotonic()
+
+    save_turns(store, 1, start=1)
+    assert len(written_turns(store)) == 1
+
+    deadline = time.monotonic() + 5
+    while len(written_turns(store)) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [turn["query"] for turn in written_turns(store)] == ["q0", "q1"]
+    assert store._conversation_log().timer is None
+
+
+def test_load_includes_buffered_turns(store, monkeypatch):
+    save_turns(store, 1)
+    monkeypatch.setattr(store_module, "FLUSH_INTERVAL", 3600.0)
+    save_turns(store, 2, start=1)
+
+    assert len(written_turns(store)) == 1
+    assert [turn["query"] for turn in store.load_conversation_history()] == ["q0", "q1", "q2"]
+    # Another store on the same directory shares the buffer
+    other = MemoryStore(store.memory_dir)
+    assert len(other.load_conversation_history()) == 3
+
+    assert store.flush()
+    assert len(written_turns(store)) == 3
+
+
+def test_history_is_capped(store):
+    save_turns(store, store_module.MAX_CONVERSATION_HISTORY + 15)
+    store.flush()
+
+    history = written_turns(store)
+    assert len(history) == store_module.MAX_CONVERSATION_HISTORY
+    assert history[0]["query"] == "q15"
+    assert history[-1]["query"] == f"q{store_module.MAX_CONVERSATION_HISTORY + 14}"
+
+
+def test_cached_json_load_sees_rewrites(store):
+    assert store.load_user_preferences() == {}
+    store.save_user_preferences({"alice": {"region": "us-ashburn-1"}})
+    first = store.load_user_preferences()
+    first["alice"]["region"] = "mutated"
+
+    # Each load parses its own copy
+    assert store.load_user_preferences() == {"alice": {"region": "us-ashburn-1"}}
+
+    store.save_user_preferences({"alice": {"region": "eu-frankfurt-1"}})
+    assert store.load_user_preferences() == {"alice": {"region": "eu-frankfurt-1"}}